@@ -0,0 +1,654 @@
+#!/usr/bin/python3
+#-*- coding: utf-8 -*-
+
+#10-2026
+
+
+########
+#The following functions time the processing functions of the notebooks on the synthetic data set
+#(see synthetic_data_function.py), store the timings as json baselines and flag the regressions.
+#Each benchmark case is registered in the CASES dictionary.
+########
+
+import os
+import io
+import sys
+import json
+import pickle
+import time
+import platform
+import contextlib
+import numpy as np
+import pandas as pd
+
+from geone import img
+from flopy.utils.triangle import Triangle as Triangle
+
+
+########
+#1
+########
+def load_functions(pathFunctions):
+    '''
+    Load a function file of the notebooks, the same way the notebooks do (exec).
+
+    Inputs :
+    -----------
+    pathFunctions : path to the python file.
+
+    Outputs :
+    -----------
+    functions : dictionary of the objects defined in the file.
+    '''
+
+    functions = {'__name__':os.path.splitext(os.path.basename(pathFunctions))[0]}
+    with open(pathFunctions, 'r') as file:
+        exec(compile(file.read(), pathFunctions, 'exec'), functions)
+
+    return functions
+
+
+########
+#2
+########
+def time_function(fun, *args, repeat=3, **kwargs):
+    '''
+    Time a function call, the best of repeat calls is kept.
+    The standard output of the function is discarded.
+
+    Inputs :
+    -----------
+    fun : function to time.
+    args, kwargs : arguments of the function.
+    repeat : number of calls.
+
+    Outputs :
+    -----------
+    best : best time in seconds.
+    result : output of the last call.
+    '''
+
+    best = np.inf
+    for i in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start  = time.perf_counter()
+            result = fun(*args, **kwargs)
+            best   = min(best, time.perf_counter()-start)
+
+    return best, result
+
+
+########
+#3
+########
+def grid_centres(geometry, step=1):
+    '''
+    Coordinates of the cell centres of the 2D grid, every step cells.
+
+    Inputs :
+    -----------
+    geometry : dictionary created with the synthetic_geometry function.
+    step : sub-sampling of the cells.
+
+    Outputs :
+    -----------
+    xi, yi : flattened arrays of the x and y coordinates.
+    '''
+
+    xG = geometry['ox']+(np.arange(0, geometry['nx'], step)+0.5)*geometry['sx']
+    yG = geometry['oy']+(np.arange(0, geometry['ny'], step)+0.5)*geometry['sy']
+    X, Y = np.meshgrid(xG, yG)
+
+    return X.ravel(), Y.ravel()
+
+
+########
+#4
+########
+def prepare_benchmark(data, pathJupyter, krige_step=4, max_targets=5000):
+    '''
+    Load the function files of the notebooks and create the inputs shared by the benchmark cases.
+    The kriging cases use a point set of the size of rotationPointsSet.csv (134 points) at every scale,
+    so the cost of the point by point kriging only grows with the number of targets, capped by max_targets.
+
+    Inputs :
+    -----------
+    data : dictionary created with the create_synthetic_dataset function.
+    pathJupyter : path to the jupyter folder of the repository.
+    krige_step : the kriging targets are the cell centres taken every krige_step cells.
+    max_targets : maximum number of kriging targets of the point by point cases (ordinary_mesh, simple),
+                  the targets are then sub-sampled regularly.
+
+    Outputs :
+    -----------
+    context : dictionary with the data, the loaded functions and the shared inputs.
+    '''
+
+    context = dict(data)
+    context['synthetic'] = load_functions(os.path.join(pathJupyter, 'benchmark', 'functions', 'synthetic_data_function.py'))
+    context['gis']      = load_functions(os.path.join(pathJupyter, 'grid_creation', 'functions', 'gis_read_function.py'))
+    context['grid']     = load_functions(os.path.join(pathJupyter, 'grid_creation', 'functions', 'grid_creation_function.py'))
+    context['rotation'] = load_functions(os.path.join(pathJupyter, 'rotation_map_creation', 'functions', 'rotation_map_creation_function.py'))
+    context['trend']    = load_functions(os.path.join(pathJupyter, 'trend_map_creation', 'functions', 'trend_creation_function.py'))
+    context['pyramid']  = load_functions(os.path.join(pathJupyter, 'grid_pyramid', 'functions', 'grid_pyramid_function.py'))
+    context['tiling']   = load_functions(os.path.join(pathJupyter, 'grid_tiling', 'functions', 'grid_tiling_function.py'))
+    context['points']   = load_functions(os.path.join(pathJupyter, 'point_store', 'functions', 'point_store_function.py'))
+    context['n_workers'] = os.cpu_count()
+
+    geometry = data['geometry']
+    context['imgTop'] = img.Img(nx=geometry['nx'], ny=geometry['ny'], nz=1,
+                                sx=geometry['sx'], sy=geometry['sy'], sz=geometry['sz'],
+                                ox=geometry['ox'], oy=geometry['oy'], oz=0,
+                                nv=1, val=data['top'])
+    context['imgBottom'] = img.Img(nx=geometry['nx'], ny=geometry['ny'], nz=1,
+                                   sx=geometry['sx'], sy=geometry['sy'], sz=geometry['sz'],
+                                   ox=geometry['ox'], oy=geometry['oy'], oz=0,
+                                   nv=1, val=data['bottom'])
+
+    #Kriging data and targets, every krige_step cells and at most max_targets
+    context['krigingPoints'] = context['synthetic']['synthetic_rotation_points'](geometry, nb_points=134,
+                                                                                 seed=data['seed'])
+    xi, yi = grid_centres(geometry, step=krige_step)
+    if xi.size > max_targets:
+        keep   = np.linspace(0, xi.size-1, max_targets).astype(int)
+        xi, yi = xi[keep], yi[keep]
+    context['xi'], context['yi'] = xi, yi
+    context['krige_step'], context['max_targets'] = krige_step, max_targets
+
+    #Triangular mesh built with the stub triangle executable, about 5000 cells per scale unit
+    lx, ly  = geometry['nx']*geometry['sx'], geometry['ny']*geometry['sy']
+    path_ws = os.path.join(data['pathData'], 'mesh')
+    os.makedirs(path_ws, exist_ok=True)
+    mesh    = Triangle(maximum_area=0.75*lx*ly/(5000*data['scale']), angle=30,
+                       model_ws=path_ws, exe_name=os.path.abspath(data['path_tri']))
+    mesh.add_polygon([tuple(p) for p in data['footprint']])
+    mesh.build()
+    context['mesh'] = mesh
+
+    #Head output written in a MODFLOW 6 binary file
+    xcyc    = mesh.get_xcyc()
+    pathSim = os.path.join(data['pathData'], 'simulation_mf6')
+    os.makedirs(pathSim, exist_ok=True)
+    context['synthetic']['write_head_file'](os.path.join(pathSim, 'mf.hds'), (xcyc[:, 0]-xcyc[:, 0].min())/lx)
+    context['pathSim'] = pathSim
+
+    mask = np.where(np.isnan(data['top']), np.nan, 1.)
+    context['mask2D'] = img.Img(nx=geometry['nx'], ny=geometry['ny'], nz=1,
+                                sx=geometry['sx'], sy=geometry['sy'], sz=1,
+                                ox=geometry['ox'], oy=geometry['oy'], oz=0,
+                                nv=1, val=mask)
+
+    return context
+
+
+########
+#5
+########
+def bench_txtToGslib_GIS(context, repeat):
+    pathGSLIB = os.path.join(context['pathData'], 'alt_toit_PC.gslib')
+    best, _   = time_function(context['gis']['txtToGslib_GIS'], context['pathTop'], pathGSLIB, repeat=repeat)
+    return best
+
+
+def bench_create3DGrid(context, repeat):
+    pathGSLIB = os.path.join(context['pathData'], '')
+    best, _   = time_function(context['grid']['create3DGrid'], context['imgTop'], context['imgBottom'], pathGSLIB,
+                              repeat=repeat)
+    return best
+
+
+def bench_cloud_experimental(context, repeat):
+    rotation = context['rotation']
+    points   = context['rotationPoints']
+
+    def cloud_experimental():
+        hc, gc = rotation['cloud'](points['x'].values, points['y'].values, points['angle'].values.astype(float))
+        return rotation['experimental'](hc, gc, 100, 200)
+
+    best, _ = time_function(cloud_experimental, repeat=repeat)
+    return best
+
+
+def bench_circular_cloud_experimental(context, repeat):
+    rotation = context['rotation']
+    points   = context['rotationPoints']
+
+    def cloud_experimental():
+        hc, gc = rotation['circular_cloud'](points['x'].values, points['y'].values, points['angle'].values)
+        return rotation['experimental'](hc, gc, 100, 200)
+
+    best, _ = time_function(cloud_experimental, repeat=repeat)
+    return best
+
+
+def bench_ordinary_mesh(context, repeat):
+    rotation = context['rotation']
+    points   = context['krigingPoints']
+    model    = lambda h: rotation['spherical'](h, 850, 8000)
+    best, _  = time_function(rotation['ordinary_mesh'], points['x'].values, points['y'].values,
+                             points['angle'].values.astype(float), context['xi'], context['yi'], model,
+                             repeat=repeat)
+    return best
+
+
+def bench_ordinary_mesh_batch(context, repeat):
+    rotation = context['rotation']
+    points   = context['krigingPoints']
+    model    = lambda h: rotation['spherical'](h, 850, 8000)
+    best, _  = time_function(rotation['ordinary_mesh_batch'], points['x'].values, points['y'].values,
+                             points['angle'].values.astype(float), context['xi'], context['yi'], model,
+                             repeat=repeat)
+    return best
+
+
+def bench_simple(context, repeat):
+    rotation = context['rotation']
+    points   = context['krigingPoints']
+    x, y, v  = points['x'].values, points['y'].values, points['angle'].values.astype(float)
+    covmodel = lambda h: 850-rotation['spherical'](h, 850, 8000)
+    xi, yi   = context['xi'], context['yi']
+
+    def simple_mesh():
+        return [rotation['simple'](x, y, v, xi[i], yi[i], covmodel, v.mean()) for i in range(xi.size)]
+
+    best, _ = time_function(simple_mesh, repeat=repeat)
+    return best
+
+
+def bench_get_head(context, repeat):
+    best, _ = time_function(context['trend']['get_head'], path=context['pathSim'], repeat=repeat)
+    return best
+
+
+def bench_mf_to_geone(context, repeat):
+    trend   = context['trend']
+    head    = trend['get_head'](path=context['pathSim'])
+    best, _ = time_function(trend['mf_to_geone'], context['mesh'], head, mask=context['mask2D'], repeat=repeat)
+    return best
+
+
+def bench_build_pyramid(context, repeat):
+    if 'simu' not in context:
+        context['simu'] = context['synthetic']['synthetic_realizations'](context['geometry'], context['top'],
+                                                                         context['bottom'], nreal=1,
+                                                                         seed=context['seed'])
+    #Full resolution file (level 0), written before the timing so only the coarse levels are timed
+    pathPickle = os.path.join(context['pathData'], 'pyramid', 'simu.pickle')
+    os.makedirs(os.path.dirname(pathPickle), exist_ok=True)
+    with open(pathPickle, 'bw') as file:
+        pickle.dump(context['simu'], file, pickle.HIGHEST_PROTOCOL)
+
+    best, _ = time_function(context['pyramid']['build_pyramid'], context['simu'], pathPickle, 'mode',
+                            nlevels=3, repeat=repeat)
+    return best
+
+
+def bench_tiled_create3DGrid(context, repeat):
+    pathGSLIB = os.path.join(context['pathData'], 'tiled_')
+    best, _   = time_function(context['tiling']['tiled_create3DGrid'], context['imgTop'], context['imgBottom'],
+                              pathGSLIB, n_workers=context['n_workers'], repeat=repeat)
+    return best
+
+
+def bench_tiled_ordinary_mesh(context, repeat):
+    rotation  = context['rotation']
+    points    = context['krigingPoints']
+    geometry  = context['geometry']
+    x, y, v   = points['x'].values, points['y'].values, points['angle'].values.astype(float)
+    model     = lambda h: rotation['spherical'](h, 850, 8000)
+
+    #The kriging matrix is factorized once, the tiles only solve their right-hand sides
+    def tiled_krige():
+        factor    = rotation['ordinary_factor'](x, y, model)
+        estimator = lambda xi, yi: rotation['ordinary_mesh_batch'](x, y, v, xi, yi, model, factor=factor)
+        return context['tiling']['tiled_estimate'](estimator, geometry['nx'], geometry['ny'],
+                                                   geometry['sx'], geometry['sy'], geometry['ox'], geometry['oy'],
+                                                   os.path.join(context['pathData'], 'tiled_krige.npy'),
+                                                   n_workers=context['n_workers'])
+
+    best, _ = time_function(tiled_krige, repeat=repeat)
+    return best
+
+
+def synthetic_grid3D(context):
+    '''
+    3D grid of the synthetic surfaces, created once (tiled_create3DGrid) and kept in the context.
+    '''
+
+    if 'grid3D' not in context:
+        context['grid3D'], _ = context['tiling']['tiled_create3DGrid'](context['imgTop'], context['imgBottom'],
+                                                                       os.path.join(context['pathData'], 'tiled_'))
+
+    return context['grid3D']
+
+
+def synthetic_trend_simulations(context, nb_layers=12):
+    '''
+    Meshes and simulation folders of the 12 layers of the trend map (createTrendMap notebook),
+    created once with the stub triangle executable and kept in the context.
+    '''
+
+    if 'trendSimulations' not in context:
+        geometry = context['geometry']
+        lx, ly   = geometry['nx']*geometry['sx'], geometry['ny']*geometry['sy']
+        meshes, paths = [], []
+        for i in range(nb_layers):
+            path_ws = os.path.join(context['pathData'], 'trend', 'mesh{}'.format(i))
+            os.makedirs(path_ws, exist_ok=True)
+            mesh = Triangle(maximum_area=0.75*lx*ly/(1000*(1+i%3)*context['scale']), angle=30,
+                            model_ws=path_ws, exe_name=os.path.abspath(context['path_tri']))
+            mesh.add_polygon([tuple(p) for p in context['footprint']])
+            mesh.build()
+            meshes.append(mesh)
+
+            xcyc    = mesh.get_xcyc()
+            pathSim = os.path.join(context['pathData'], 'trend', 'simulation{}'.format(i))
+            os.makedirs(pathSim, exist_ok=True)
+            context['synthetic']['write_head_file'](os.path.join(pathSim, 'mf.hds'),
+                                                    (xcyc[:, 0]-geometry['ox'])/lx+i)
+            paths.append(pathSim)
+        context['trendSimulations'] = {'meshes':meshes, 'paths':paths,
+                                       'layers':[0, 10, 100, 110, 20, 30, 40, 50, 60, 70, 80, 90][:nb_layers]}
+
+    return context['trendSimulations']
+
+
+def bench_rotation_maps(context, repeat):
+    synthetic_grid3D(context)
+    rotation = context['rotation']
+    points   = context['krigingPoints']
+    geometry = context['geometry']
+    model    = lambda h: rotation['spherical'](h, 850, 8000)
+    best, _  = time_function(rotation['rotation_maps'], points['x'].values, points['y'].values,
+                             points['angle'].values, model,
+                             geometry['nx'], geometry['ny'], geometry['sx'], geometry['sy'],
+                             geometry['ox'], geometry['oy'], mask=context['grid3D'].val[1], repeat=repeat)
+    return best
+
+
+def bench_trend_loop(context, repeat):
+    trend  = context['trend']
+    grid3D = synthetic_grid3D(context)
+    sims   = synthetic_trend_simulations(context)
+
+    #Loop of the createTrendMap notebook
+    def trend_loop():
+        trends = []
+        for i, layer in enumerate(sims['layers']):
+            mask2D = img.Img(nx=grid3D.nx, ny=grid3D.ny, nz=1,
+                             ox=grid3D.ox, oy=grid3D.oy, oz=0,
+                             sx=grid3D.sx, sy=grid3D.sy,
+                             nv=1, val=grid3D.val[1, layer, :, :])
+            head = trend['get_head'](path=sims['paths'][i])
+            trends.append(trend['mf_to_geone'](sims['meshes'][i], head, mask=mask2D))
+
+        order     = np.argsort(sims['layers'])
+        trend_map = np.full((1, 125, grid3D.ny, grid3D.nx), np.nan)
+        for i in range(len(order)):
+            for j in range(10):
+                trend_map[0, j+i*10, :, :] = trends[order[i]].val[0, 0, :, :]
+        trend_map[grid3D.val[1:, :125, :, :] != 1] = np.nan
+        return trend_map
+
+    best, _ = time_function(trend_loop, repeat=repeat)
+    return best
+
+
+def bench_trend_batch(context, repeat):
+    trend  = context['trend']
+    grid3D = synthetic_grid3D(context)
+    sims   = synthetic_trend_simulations(context)
+
+    def trend_batch():
+        heads, offsets = trend['read_heads'](sims['paths'])
+        return trend['heads_to_trend'](sims['meshes'], heads, offsets, sims['layers'], grid3D, nz=125)
+
+    best, _ = time_function(trend_batch, repeat=repeat)
+    return best
+
+
+def synthetic_point_queries(context, nb_points=1000000, nb_queries=50):
+    '''
+    Large hard data set (nb_points per scale unit) written as csv and as point store,
+    and the region queries (2 km boxes and 20 m z-slabs), created once and kept in the context.
+    '''
+
+    if 'pointQueries' not in context:
+        geometry = context['geometry']
+        hardData = context['synthetic']['synthetic_hard_data'](geometry, nb_wells=int(nb_points*context['scale']/100),
+                                                               seed=context['seed'])
+        pathCSV  = os.path.join(context['pathData'], 'hd_large.csv')
+        hardData.to_csv(pathCSV, index=False)
+        pathStore = os.path.join(context['pathData'], 'hd_large_store')
+        with contextlib.redirect_stdout(io.StringIO()):
+            context['points']['create_point_store'](pathCSV, pathStore)
+
+        rng    = np.random.default_rng(context['seed'])
+        lx, ly = geometry['nx']*geometry['sx'], geometry['ny']*geometry['sy']
+        x0     = geometry['ox']+rng.uniform(0, lx-2000, nb_queries)
+        y0     = geometry['oy']+rng.uniform(0, ly-2000, nb_queries)
+        z0     = rng.uniform(-150, -20, nb_queries)
+        context['pointQueries'] = {'pathCSV':pathCSV, 'pathStore':pathStore,
+                                   'boxes':np.column_stack((x0, x0+2000, y0, y0+2000, z0, z0+20))}
+
+    return context['pointQueries']
+
+
+def bench_points_pandas(context, repeat):
+    queries = synthetic_point_queries(context)
+
+    def load_query():
+        table = pd.read_csv(queries['pathCSV'])
+        return [table[(table['X']>=x0) & (table['X']<=x1) & (table['Y']>=y0) & (table['Y']<=y1) &
+                      (table['Z']>=z0) & (table['Z']<=z1)] for x0, x1, y0, y1, z0, z1 in queries['boxes']]
+
+    best, _ = time_function(load_query, repeat=repeat)
+    return best
+
+
+def bench_points_store(context, repeat):
+    queries = synthetic_point_queries(context)
+
+    def load_query():
+        store = context['points']['PointStore'](queries['pathStore'])
+        return [store.take(store.bbox(x0, x1, y0, y1, zmin=z0, zmax=z1)) for x0, x1, y0, y1, z0, z1 in queries['boxes']]
+
+    best, _ = time_function(load_query, repeat=repeat)
+    return best
+
+
+CASES = {'txtToGslib_GIS':bench_txtToGslib_GIS,
+         'create3DGrid':bench_create3DGrid,
+         'cloud_experimental':bench_cloud_experimental,
+         'circular_cloud_experimental':bench_circular_cloud_experimental,
+         'ordinary_mesh':bench_ordinary_mesh,
+         'ordinary_mesh_batch':bench_ordinary_mesh_batch,
+         'simple':bench_simple,
+         'get_head':bench_get_head,
+         'mf_to_geone':bench_mf_to_geone,
+         'build_pyramid':bench_build_pyramid,
+         'tiled_create3DGrid':bench_tiled_create3DGrid,
+         'tiled_ordinary_mesh':bench_tiled_ordinary_mesh,
+         'rotation_maps':bench_rotation_maps,
+         'trend_loop':bench_trend_loop,
+         'trend_batch':bench_trend_batch,
+         'points_pandas':bench_points_pandas,
+         'points_store':bench_points_store}
+
+
+def case_memory(name, context, tile_cells=256*256):
+    '''
+    Estimated peak memory of a benchmark case, setup included, in bytes.
+    The coefficients are the peaks traced (tracemalloc) at the scales 0.3 and 1, rounded up,
+    the tiled cases count one tile per worker process.
+
+    Inputs :
+    -----------
+    name : name of the case.
+    context : dictionary created with the prepare_benchmark function.
+    tile_cells : number of cells of the tiles (tile_nx*tile_ny).
+
+    Outputs :
+    -----------
+    memory : estimated peak memory in bytes.
+    '''
+
+    geometry = context['geometry']
+    cells2D  = geometry['nx']*geometry['ny']
+    cells3D  = cells2D*geometry['nz']
+    n_points = len(context['rotationPoints'])
+    tiles    = context['n_workers']*17*geometry['nz']*tile_cells
+
+    estimates = {'txtToGslib_GIS':90*cells2D,
+                 'create3DGrid':33*cells3D,
+                 'cloud_experimental':40*n_points**2/2+1e6,
+                 'circular_cloud_experimental':40*n_points**2/2+1e6,
+                 'ordinary_mesh':200*context['max_targets']+1e6,
+                 'ordinary_mesh_batch':200*context['max_targets']+3.5e7,
+                 'simple':200*context['max_targets']+1e6,
+                 'get_head':1e6*context['scale']+1e6,
+                 'mf_to_geone':50*cells2D,
+                 'build_pyramid':18*cells3D,
+                 'tiled_create3DGrid':tiles+100*cells2D,
+                 'tiled_ordinary_mesh':context['n_workers']*7e7+20*cells2D,
+                 'rotation_maps':18*cells3D+tiles,
+                 'trend_loop':11*cells3D+tiles,
+                 'trend_batch':11*cells3D+tiles,
+                 'points_pandas':150*1e6*context['scale'],
+                 'points_store':150*1e6*context['scale']}
+
+    return int(estimates[name])
+
+
+def physical_memory():
+    '''
+    Physical memory of the machine in bytes, None if it is not available.
+    '''
+
+    try:
+        return os.sysconf('SC_PAGE_SIZE')*os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+########
+#6
+########
+def run_benchmark(context, cases=None, repeat=3, max_memory=None):
+    '''
+    Run the benchmark cases.
+    The cases whose estimated memory (case_memory) exceeds max_memory are skipped,
+    they are listed with their estimate in the metadata of the results.
+
+    Inputs :
+    -----------
+    context : dictionary created with the prepare_benchmark function.
+    cases : list of the case names to run, all the cases of CASES if None.
+    repeat : number of calls of each case, the best time is kept.
+    max_memory : memory budget in bytes, no limit if None.
+
+    Outputs :
+    -----------
+    results : dictionary with the metadata of the run and the time in seconds of each case.
+    '''
+
+    if cases is None:
+        cases = list(CASES.keys())
+
+    timings, skipped = {}, {}
+    for name in cases:
+        memory = case_memory(name, context)
+        if max_memory is not None and memory > max_memory:
+            skipped[name] = memory
+            print('{:<30} {:>10} (estimated {:.1f} GB > {:.1f} GB)'.format(name, 'skipped', memory/1e9,
+                                                                            max_memory/1e9))
+            continue
+        timings[name] = CASES[name](context, repeat)
+        print('{:<30} {:>10.4f} s'.format(name, timings[name]))
+
+    results = {'meta':{'version':context['version'], 'scale':context['scale'], 'seed':context['seed'],
+                       'repeat':repeat, 'krige_step':context['krige_step'], 'max_targets':context['max_targets'],
+                       'max_memory':max_memory, 'skipped':skipped,
+                       'geometry':context['geometry'],
+                       'python':sys.version.split()[0], 'numpy':np.__version__,
+                       'platform':platform.platform(), 'date':time.strftime('%Y-%m-%d %H:%M:%S')},
+               'timings':timings}
+
+    return results
+
+
+########
+#7
+########
+def save_baseline(results, pathJSON):
+    '''
+    Save the benchmark results as a json baseline.
+
+    Inputs :
+    -----------
+    results : dictionary created with the run_benchmark function.
+    pathJSON : path of the json file.
+
+    Outputs :
+    -----------
+    The baseline is written at pathJSON.
+    '''
+
+    folder = os.path.dirname(pathJSON)
+    if folder != '':
+        os.makedirs(folder, exist_ok=True)
+
+    with open(pathJSON, 'w') as file:
+        json.dump(results, file, indent=2)
+
+    return
+
+
+########
+#8
+########
+def compare_baseline(results, pathJSON, threshold=0.2):
+    '''
+    Compare benchmark results to a json baseline.
+    A case is a regression when its time exceeds the baseline time by more than threshold (relative).
+    The baseline is refused (ValueError) when it was measured on other inputs : other version of the
+    synthetic data generators, scale, seed, number of calls or kriging targets.
+
+    Inputs :
+    -----------
+    results : dictionary created with the run_benchmark function.
+    pathJSON : path of the baseline json file.
+    threshold : relative slow down allowed, 0.2 means 20 %.
+
+    Outputs :
+    -----------
+    regressions : dictionary of the regressed cases with their time ratio to the baseline.
+    '''
+
+    with open(pathJSON, 'r') as file:
+        baseline = json.load(file)
+
+    #Baselines saved before the generator version was stored are version 1
+    keys       = ['version', 'scale', 'seed', 'repeat', 'krige_step', 'max_targets']
+    defaults   = {'version':1}
+    mismatches = ['{} {} (run {})'.format(key, baseline['meta'].get(key, defaults.get(key)), results['meta'][key])
+                  for key in keys if baseline['meta'].get(key, defaults.get(key)) != results['meta'][key]]
+    if len(mismatches) > 0:
+        raise ValueError('baseline {} is not comparable : {}'.format(pathJSON, ', '.join(mismatches)))
+
+    for name, memory in results['meta'].get('skipped', {}).items():
+        print('{:<30} {:>10}   (estimated {:.1f} GB)'.format(name, 'skipped', memory/1e9))
+
+    regressions = {}
+    for name, t in results['timings'].items():
+        if name not in baseline['timings']:
+            print('{:<30} {:>10.4f} s   (no baseline)'.format(name, t))
+            continue
+        ratio = t/baseline['timings'][name]
+        flag  = ''
+        if ratio > 1+threshold:
+            regressions[name] = ratio
+            flag = 'REGRESSION'
+        print('{:<30} {:>10.4f} s   x{:.2f}   {}'.format(name, t, ratio, flag))
+
+    return regressions
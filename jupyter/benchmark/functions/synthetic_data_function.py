@@ -0,0 +1,485 @@
+#!/usr/bin/python3
+#-*- coding: utf-8 -*-
+
+#10-2026
+
+
+########
+#The following functions create synthetic inputs at the scale of the Roussillon model
+#(409x512x125 cells of 100x100x2 m), so the processing functions can be timed without the real data.
+#The scale parameter multiplies the number of lateral cells (1, 10, 100 times the Roussillon grid).
+########
+
+import os
+import stat
+import numpy as np
+import pandas as pd
+
+from geone import img
+
+
+#Roussillon reference geometry
+NX, NY, NZ = 409, 512, 125
+SX, SY, SZ = 100, 100, 2
+OX, OY, OZ = 664328.1865, 6153000.2413, -250
+
+#Version of the generators, increased when the synthetic data change for a given seed
+#(version 2 : surfaces normalised under the footprint to span the 125 layers),
+#the benchmark baselines of another version are not comparable
+GENERATOR_VERSION = 2
+
+
+########
+#1
+########
+def synthetic_geometry(scale=1):
+    '''
+    Geometry of the synthetic grid for a given scale.
+    The number of lateral cells is multiplied by scale, the cell size and the number of layers are kept.
+
+    Inputs :
+    -----------
+    scale : multiplying factor of the number of lateral cells (1, 10, 100...).
+
+    Outputs :
+    -----------
+    geometry : dictionary with the keys nx, ny, nz, sx, sy, sz, ox, oy, oz.
+    '''
+
+    factor = np.sqrt(scale)
+
+    geometry = {'nx':int(round(NX*factor)), 'ny':int(round(NY*factor)), 'nz':NZ,
+                'sx':SX, 'sy':SY, 'sz':SZ,
+                'ox':OX, 'oy':OY, 'oz':OZ}
+
+    return geometry
+
+
+########
+#2
+########
+def synthetic_footprint(geometry, nb_vertices=40):
+    '''
+    Polygon of the modelled area, an ellipse inscribed in the grid.
+
+    Inputs :
+    -----------
+    geometry : dictionary created with the synthetic_geometry function.
+    nb_vertices : number of vertices of the polygon.
+
+    Outputs :
+    -----------
+    polygon : array (nb_vertices, 2) of the x, y coordinates of the vertices (anticlockwise).
+    '''
+
+    lx, ly = geometry['nx']*geometry['sx'], geometry['ny']*geometry['sy']
+    xc, yc = geometry['ox']+lx/2, geometry['oy']+ly/2
+
+    t       = np.linspace(0, 2*np.pi, nb_vertices, endpoint=False)
+    polygon = np.column_stack((xc+0.48*lx*np.cos(t), yc+0.48*ly*np.sin(t)))
+
+    return polygon
+
+
+########
+#3
+########
+def synthetic_surfaces(geometry, seed=0):
+    '''
+    Create the top and bottom topography of a synthetic Pliocene layer.
+    The surfaces are smooth, the bottom lies between -250 and -100 m, the top reaches 0 m
+    and the thickness is at least 10 m.
+    Cells outside the footprint ellipse are set to nan.
+
+    Inputs :
+    -----------
+    geometry : dictionary created with the synthetic_geometry function.
+    seed : seed of the random generator.
+
+    Outputs :
+    -----------
+    top, bottom : arrays (ny, nx) of the top and bottom altitudes.
+    '''
+
+    rng    = np.random.default_rng(seed)
+    nx, ny = geometry['nx'], geometry['ny']
+
+    u, v   = np.meshgrid((np.arange(nx)+0.5)/nx, (np.arange(ny)+0.5)/ny)
+    phase  = rng.uniform(0, 2*np.pi, 4)
+
+    f1 = 0.5+0.25*np.sin(2*np.pi*u+phase[0])*np.cos(np.pi*v+phase[1])+0.25*np.sin(3*np.pi*(u+v)+phase[2])
+    f2 = 0.5+0.5*np.sin(2*np.pi*v+phase[3])*np.cos(np.pi*u)
+
+    #Mask outside the ellipse
+    outside     = ((u-0.5)/0.48)**2+((v-0.5)/0.48)**2 > 1
+    f1[outside] = np.nan
+    f1          = (f1-np.nanmin(f1))/(np.nanmax(f1)-np.nanmin(f1))
+
+    #The bottom reaches -250 m and the top 0 m, as the 125 layers of 2 m of the Roussillon grid
+    bottom = -250+150*f1
+    top    = bottom+10+90*f2
+    top    = top-np.nanmax(top)
+
+    return top, bottom
+
+
+########
+#4
+########
+def write_ascii_raster(val, geometry, pathTXT, nanV=-999):
+    '''
+    Write a 2D array to an ASCII raster as exported from QGIS (GRASS header),
+    the format read by the txtToGslib_GIS function.
+
+    Inputs :
+    -----------
+    val : array (ny, nx), the first row is the southern one.
+    geometry : dictionary created with the synthetic_geometry function.
+    pathTXT : path of the ascii file to create.
+    nanV : no value of the ascii file.
+
+    Outputs :
+    -----------
+    The ascii file is written at pathTXT.
+    '''
+
+    ny, nx = val.shape
+    sx, sy = geometry['sx'], geometry['sy']
+    ox, oy = geometry['ox'], geometry['oy']
+
+    data = np.where(np.isnan(val), nanV, val)[::-1]
+
+    with open(pathTXT, 'w') as textASCII:
+        textASCII.write('north: {}\n'.format(oy+ny*sy))
+        textASCII.write('south: {}\n'.format(oy))
+        textASCII.write('east: {}\n'.format(ox+nx*sx))
+        textASCII.write('west: {}\n'.format(ox))
+        textASCII.write('rows: {}\n'.format(ny))
+        textASCII.write('cols: {}\n'.format(nx))
+        np.savetxt(textASCII, data, fmt='%.6g')
+
+    return
+
+
+########
+#5
+########
+def synthetic_rotation_points(geometry, nb_points=134, seed=0):
+    '''
+    Create a rotation point set like rotationPointsSet.csv (angle, x, y).
+    The angles follow a smooth regional field between -100 and 65 degrees, rounded to 5 degrees.
+
+    Inputs :
+    -----------
+    geometry : dictionary created with the synthetic_geometry function.
+    nb_points : number of points.
+    seed : seed of the random generator.
+
+    Outputs :
+    -----------
+    points : DataFrame with the columns angle, x, y.
+    '''
+
+    rng    = np.random.default_rng(seed)
+    lx, ly = geometry['nx']*geometry['sx'], geometry['ny']*geometry['sy']
+
+    u, v  = rng.uniform(0.05, 0.95, nb_points), rng.uniform(0.05, 0.95, nb_points)
+    angle = -17.5+82.5*np.sin(np.pi*u)*np.cos(1.5*np.pi*v)+rng.normal(0, 10, nb_points)
+    angle = 5*np.round(np.clip(angle, -100, 65)/5)
+
+    points = pd.DataFrame({'angle':angle.astype(int),
+                           'x':geometry['ox']+u*lx,
+                           'y':geometry['oy']+v*ly})
+
+    return points
+
+
+########
+#6
+########
+def synthetic_hard_data(geometry, nb_wells=50, seed=0):
+    '''
+    Create a hard data set like hd_merge.csv (X, Y, Z, facies).
+    Each well is a vertical succession of 1 m samples with facies 0, 1, 2 or 4.
+
+    Inputs :
+    -----------
+    geometry : dictionary created with the synthetic_geometry function.
+    nb_wells : number of wells.
+    seed : seed of the random generator.
+
+    Outputs :
+    -----------
+    hard_data : DataFrame with the columns X, Y, Z, facies.
+    '''
+
+    rng    = np.random.default_rng(seed)
+    lx, ly = geometry['nx']*geometry['sx'], geometry['ny']*geometry['sy']
+
+    length = rng.integers(40, 160, nb_wells)
+    top    = rng.integers(-120, 0, nb_wells)
+    well   = np.repeat(np.arange(nb_wells), length)
+    depth  = np.arange(well.size)-np.repeat(np.cumsum(length)-length, length)
+
+    #Facies are drawn by beds of a few meters
+    beds   = rng.choice([0, 1, 2, 4], size=well.size, p=[0.48, 0.31, 0.04, 0.17])
+    facies = beds[(np.arange(well.size)//5)*5]
+
+    hard_data = pd.DataFrame({'X':(geometry['ox']+rng.uniform(0.05, 0.95, nb_wells)*lx)[well],
+                              'Y':(geometry['oy']+rng.uniform(0.05, 0.95, nb_wells)*ly)[well],
+                              'Z':top[well]-depth,
+                              'facies':facies})
+
+    return hard_data
+
+
+########
+#7
+########
+def synthetic_ti(nx=175, ny=300, seed=0):
+    '''
+    Create a 2D training image like ti_concept.gslib, with a channel facies and a trend variable.
+
+    Inputs :
+    -----------
+    nx, ny : dimensions of the TI.
+    seed : seed of the random generator.
+
+    Outputs :
+    -----------
+    ti : Img object with two variables (facies, trend).
+    '''
+
+    rng  = np.random.default_rng(seed)
+    x, y = np.meshgrid(np.arange(nx), np.arange(ny))
+
+    facies = np.zeros((ny, nx))
+    for xc in rng.uniform(0, nx, max(1, nx//25)):
+        meander = xc+8*np.sin(2*np.pi*y/rng.uniform(40, 120)+rng.uniform(0, 2*np.pi))
+        facies[np.abs(x-meander) < 3] = 1
+
+    trend = np.repeat(np.arange(ny)/(ny-1), nx).reshape(ny, nx)
+
+    ti = img.Img(nx=nx, ny=ny, nz=1,
+                 sx=1.0, sy=1.0, sz=1.0,
+                 ox=0.0, oy=0.0, oz=0.0,
+                 nv=2, val=np.stack((facies, trend))[:, np.newaxis],
+                 varname=['facies', 'trend'])
+
+    return ti
+
+
+########
+#8
+########
+def synthetic_realizations(geometry, top, bottom, nreal=4, seed=0):
+    '''
+    Create an ensemble of facies realizations on the synthetic grid.
+    Cells outside the Pliocene layer are set to nan.
+
+    Inputs :
+    -----------
+    geometry : dictionary created with the synthetic_geometry function.
+    top, bottom : arrays created with the synthetic_surfaces function.
+    nreal : number of realizations.
+    seed : seed of the random generator.
+
+    Outputs :
+    -----------
+    simu : Img object with one variable per realization.
+    '''
+
+    rng        = np.random.default_rng(seed)
+    nx, ny, nz = geometry['nx'], geometry['ny'], geometry['nz']
+
+    z      = geometry['oz']+(np.arange(nz)+0.5)*geometry['sz']
+    inside = (z[:, np.newaxis, np.newaxis] >= bottom) & (z[:, np.newaxis, np.newaxis] <= top)
+
+    codes = np.array([0, 1, 2, 4], dtype=np.float32)
+    val   = np.full((nreal, nz, ny, nx), np.nan, dtype=np.float32)
+    for i in range(nreal):
+        #Facies drawn on coarse blocks to mimic geobodies
+        coarse = rng.choice(codes, size=(nz, ny//4+1, nx//4+1), p=[0.48, 0.31, 0.04, 0.17])
+        coarse = coarse.repeat(4, axis=1).repeat(4, axis=2)[:, :ny, :nx]
+        val[i][inside] = coarse[inside]
+
+    simu = img.Img(nx=nx, ny=ny, nz=nz,
+                   sx=geometry['sx'], sy=geometry['sy'], sz=geometry['sz'],
+                   ox=geometry['ox'], oy=geometry['oy'], oz=geometry['oz'],
+                   nv=nreal, val=val,
+                   varname=['real{:03d}'.format(i) for i in range(nreal)])
+
+    return simu
+
+
+########
+#9
+########
+def write_head_file(pathHDS, head, kstp=1, kper=1, totim=1.0):
+    '''
+    Write head values to a MODFLOW 6 binary head file (double precision, DISV grid).
+    Each layer is stored as one record with a 52 bytes header followed by the ncpl values.
+
+    Inputs :
+    -----------
+    pathHDS : path of the .hds file to create.
+    head : array (nlay, ncpl) of head values.
+    kstp, kper, totim : time step, stress period and simulation time of the record.
+
+    Outputs :
+    -----------
+    The binary file is written at pathHDS.
+    '''
+
+    head = np.atleast_2d(np.asarray(head, dtype='<f8'))
+    nlay, ncpl = head.shape
+
+    dtype_header = np.dtype([('kstp', '<i4'), ('kper', '<i4'), ('pertim', '<f8'), ('totim', '<f8'),
+                             ('text', 'S16'), ('ncol', '<i4'), ('nrow', '<i4'), ('ilay', '<i4')])
+
+    with open(pathHDS, 'wb') as file:
+        for ilay in range(nlay):
+            header = np.array([(kstp, kper, totim, totim, b'HEAD'.rjust(16), ncpl, 1, ilay+1)], dtype=dtype_header)
+            file.write(header.tobytes())
+            file.write(head[ilay].tobytes())
+
+    return
+
+
+########
+#10
+########
+STUB_TRIANGLE = r'''#!/usr/bin/env python3
+#Stub of the triangle executable, for benchmarks only.
+#Reads the <prefix>.0.node/.0.poly files written by flopy, meshes the polygon with a Delaunay
+#triangulation of the vertices and of a regular set of interior points (spacing from -a<area>),
+#and writes the <prefix>.1.node/.ele/.edge/.neigh files read back by flopy.
+import sys
+import numpy as np
+from scipy.spatial import Delaunay
+from matplotlib.path import Path
+
+args   = sys.argv[1:]
+prefix = args[-1][:-2]
+area   = float([a[2:] for a in args if a.startswith('-a')][0] or 1.)
+
+vert = np.loadtxt(prefix+'.0.node', skiprows=1, ndmin=2)[:, 1:3]
+with open(prefix+'.0.poly') as f:
+    lines = f.readlines()
+nseg = int(lines[1].split()[0])
+seg  = np.array([l.split() for l in lines[2:2+nseg]], dtype=int)[:, 1:4]
+
+poly    = Path(vert)
+spacing = np.sqrt(2*area)
+xg, yg  = np.meshgrid(np.arange(vert[:, 0].min(), vert[:, 0].max(), spacing)+spacing/2,
+                      np.arange(vert[:, 1].min(), vert[:, 1].max(), spacing)+spacing/2)
+inner   = np.column_stack((xg.ravel(), yg.ravel()))
+inner   = inner[poly.contains_points(inner, radius=-spacing/4)]
+points  = np.vstack((vert, inner))
+
+tri  = Delaunay(points)
+keep = poly.contains_points(points[tri.simplices].mean(axis=1))
+ele  = tri.simplices[keep]
+new  = -np.ones(keep.size, dtype=int)
+new[keep] = np.arange(keep.sum())
+neigh = np.where(tri.neighbors[keep] >= 0, new[tri.neighbors[keep]], -1)
+
+edges   = np.unique(np.sort(np.vstack((ele[:, [0, 1]], ele[:, [1, 2]], ele[:, [2, 0]])), axis=1), axis=0)
+markers = dict(((min(a, b), max(a, b)), m) for a, b, m in seg)
+bm      = [markers.get((a, b), 0) for a, b in edges]
+
+with open(prefix+'.1.node', 'w') as f:
+    f.write('{} 2 0 0\n'.format(len(points)))
+    for i, (x, y) in enumerate(points):
+        f.write('{} {:.17g} {:.17g}\n'.format(i, x, y))
+with open(prefix+'.1.ele', 'w') as f:
+    f.write('{} 3 0\n'.format(len(ele)))
+    for i, (a, b, c) in enumerate(ele):
+        f.write('{} {} {} {}\n'.format(i, a, b, c))
+with open(prefix+'.1.edge', 'w') as f:
+    f.write('{} 1\n'.format(len(edges)))
+    for i, ((a, b), m) in enumerate(zip(edges, bm)):
+        f.write('{} {} {} {}\n'.format(i, a, b, m))
+with open(prefix+'.1.neigh', 'w') as f:
+    f.write('{} 3\n'.format(len(ele)))
+    for i, (a, b, c) in enumerate(neigh):
+        f.write('{} {} {} {}\n'.format(i, a, b, c))
+print('Stub triangle: {} triangles'.format(len(ele)))
+'''
+
+def write_stub_triangle(pathBin):
+    '''
+    Write a stub triangle executable, used instead of the real binary in the benchmarks.
+    The stub produces files in the format read by flopy but does not reproduce the real meshing.
+
+    Inputs :
+    -----------
+    pathBin : folder where to store the executable.
+
+    Outputs :
+    -----------
+    path_tri : path to the stub executable.
+    '''
+
+    os.makedirs(pathBin, exist_ok=True)
+    path_tri = os.path.join(pathBin, 'triangle')
+
+    with open(path_tri, 'w') as file:
+        file.write(STUB_TRIANGLE)
+    os.chmod(path_tri, os.stat(path_tri).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+    return path_tri
+
+
+########
+#11
+########
+def create_synthetic_dataset(pathData, scale=1, seed=0):
+    '''
+    Create the synthetic data set used by the benchmarks.
+    The files are written in pathData and the in memory objects are returned.
+
+    Inputs :
+    -----------
+    pathData : folder where to store the synthetic files.
+    scale : multiplying factor of the number of lateral cells (1, 10, 100...).
+    seed : seed of the random generator.
+
+    Outputs :
+    -----------
+    data : dictionary with the geometry, the surfaces, the point sets, the TI, the paths of the files
+           and the version of the generators.
+    '''
+
+    os.makedirs(pathData, exist_ok=True)
+    geometry    = synthetic_geometry(scale)
+    top, bottom = synthetic_surfaces(geometry, seed=seed)
+
+    pathTop    = os.path.join(pathData, 'alt_toit_PC.txt')
+    pathBottom = os.path.join(pathData, 'alt_mur_PC.txt')
+    write_ascii_raster(top, geometry, pathTop)
+    write_ascii_raster(bottom, geometry, pathBottom)
+
+    rotationPoints = synthetic_rotation_points(geometry, nb_points=int(134*scale), seed=seed)
+    pathRotation   = os.path.join(pathData, 'rotationPointsSet.csv')
+    rotationPoints.to_csv(pathRotation, index=False)
+
+    hardData     = synthetic_hard_data(geometry, nb_wells=int(50*scale), seed=seed)
+    pathHardData = os.path.join(pathData, 'hd_merge.csv')
+    hardData.to_csv(pathHardData, index=False)
+
+    ti     = synthetic_ti(seed=seed)
+    pathTI = os.path.join(pathData, 'ti_synthetic.gslib')
+    img.writeImageGslib(ti, pathTI)
+
+    path_tri = write_stub_triangle(os.path.join(pathData, 'linux_bin'))
+
+    data = {'geometry':geometry, 'top':top, 'bottom':bottom,
+            'footprint':synthetic_footprint(geometry),
+            'rotationPoints':rotationPoints, 'hardData':hardData, 'ti':ti,
+            'pathTop':pathTop, 'pathBottom':pathBottom,
+            'pathRotation':pathRotation, 'pathHardData':pathHardData, 'pathTI':pathTI,
+            'path_tri':path_tri,
+            'pathData':pathData, 'scale':scale, 'seed':seed, 'version':GENERATOR_VERSION}
+
+    return data
@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+#-*- coding: utf-8 -*-
+
+#10-2026
+
+########
+#Run the benchmark of the notebook functions on synthetic data.
+#Examples :
+#   python runBenchmark.py --scale 1 --save               (store the baseline)
+#   python runBenchmark.py --scale 1 --threshold 0.2      (compare to the baseline, exit 1 on regression)
+########
+
+import os
+import sys
+import argparse
+
+pathBenchmark = os.path.dirname(os.path.abspath(__file__))
+pathJupyter   = os.path.dirname(pathBenchmark)
+
+exec(open(os.path.join(pathBenchmark, 'functions', 'synthetic_data_function.py')).read())
+exec(open(os.path.join(pathBenchmark, 'functions', 'benchmark_function.py')).read())
+
+
+parser = argparse.ArgumentParser(description='Benchmark of the MPS Roussillon processing functions.')
+parser.add_argument('--scale', type=float, default=1, help='multiplying factor of the lateral number of cells')
+parser.add_argument('--seed', type=int, default=0, help='seed of the synthetic data')
+parser.add_argument('--repeat', type=int, default=3, help='number of calls per case, the best is kept')
+parser.add_argument('--krige-step', type=int, default=4, help='kriging targets every krige-step cells')
+parser.add_argument('--max-targets', type=int, default=5000, help='maximum number of point by point kriging targets')
+parser.add_argument('--max-memory', type=float, default=None,
+                    help='memory budget in GB, the cases estimated above are skipped (default 80 %% of the physical memory)')
+parser.add_argument('--cases', nargs='*', default=None, help='cases to run ({})'.format(', '.join(CASES)))
+parser.add_argument('--data', default=os.path.join(pathBenchmark, 'data'), help='folder of the synthetic data')
+parser.add_argument('--baseline', default=None, help='json baseline file')
+parser.add_argument('--save', action='store_true', help='save the results as baseline instead of comparing')
+parser.add_argument('--threshold', type=float, default=0.2, help='relative slow down flagged as regression')
+args = parser.parse_args()
+
+scale = int(args.scale) if float(args.scale).is_integer() else args.scale
+if args.baseline is None:
+    args.baseline = os.path.join(pathBenchmark, 'baselines', 'baseline_scale{}.json'.format(scale))
+
+print('*** Create synthetic data (scale {}) ***'.format(scale))
+data    = create_synthetic_dataset(os.path.join(args.data, 'scale{}'.format(scale)), scale=scale, seed=args.seed)
+context = prepare_benchmark(data, pathJupyter, krige_step=args.krige_step, max_targets=args.max_targets)
+
+print('*** Run benchmark ***')
+if args.max_memory is not None:
+    max_memory = args.max_memory*1e9
+elif physical_memory() is not None:
+    max_memory = 0.8*physical_memory()
+else:
+    max_memory = None
+results = run_benchmark(context, cases=args.cases, repeat=args.repeat, max_memory=max_memory)
+
+if args.save or not os.path.exists(args.baseline):
+    save_baseline(results, args.baseline)
+    print('*** Baseline saved to {} ***'.format(args.baseline))
+else:
+    print('*** Compare to {} ***'.format(args.baseline))
+    try:
+        regressions = compare_baseline(results, args.baseline, threshold=args.threshold)
+    except ValueError as error:
+        print('*** {}, run with --save to store a new baseline ***'.format(error))
+        sys.exit(2)
+    if len(regressions) > 0:
+        print('*** {} regression(s) : {} ***'.format(len(regressions), ', '.join(regressions)))
+        sys.exit(1)
+    print('*** No regression ***')
@@ -0,0 +1,244 @@
+#!/usr/bin/python3
+#-*- coding: utf-8 -*-
+
+#10-2026
+
+
+########
+#The following functions build multi-resolution versions (pyramid) of the grids, auxiliary maps and simulation outputs.
+#The level k is obtained by reducing blocks of 2 cells of the level k-1, the level 0 being the full resolution Img:
+#mode for the facies, mean for the trend and rotation maps, any or all for the masks.
+#The levels are stored as pickle files next to the full resolution file and loaded on demand.
+########
+
+import os
+import re
+import pickle
+import numpy as np
+
+from geone import img
+
+
+METHODS = ['mode', 'mean', 'any', 'all']
+
+
+########
+#1
+########
+def block_reduce(val, method, factor=2, axes='xy'):
+    '''
+    Reduce a 3D array by blocks of cells.
+    The array is padded with nan when its dimensions are not multiple of factor,
+    the padded cells are not taken into account.
+    The blocks are reduced by slabs of factor layers (or one layer for axes='xy'),
+    so the temporary arrays are those of one slab.
+
+    Inputs :
+    -----------
+    val : array (nz, ny, nx).
+    method : 'mode' (most frequent value, the smallest one in case of tie, computed on the sorted
+             values of each block so it also holds for continuous values),
+             'mean', 'any' (1 if one cell equals 1) or 'all' (1 if all the cells equal 1).
+             The nan values are ignored, a block with only nan values gives nan.
+    factor : number of cells of the block along each reduced axis.
+    axes : reduced axes, 'xy' or 'xyz'.
+
+    Outputs :
+    -----------
+    reduced : array (nz', ny', nx') of the reduced values, float32 for a float32 input, float64 otherwise.
+    '''
+
+    if method not in METHODS:
+        raise ValueError('method must be one of {}'.format(METHODS))
+
+    nz, ny, nx = val.shape
+    fz = factor if 'z' in axes else 1
+    fy = factor if 'y' in axes else 1
+    fx = factor if 'x' in axes else 1
+    mz, my, mx = -(-nz//fz), -(-ny//fy), -(-nx//fx)
+    dtype   = np.float32 if val.dtype == np.float32 else np.float64
+    nb      = fz*fy*fx
+    reduced = np.full((mz, my, mx), np.nan, dtype=dtype)
+
+    #The padding cells are flagged with nan, or 1 for the all method so they do not change the result
+    padded = np.full((fz, my*fy, mx*fx), 1. if method=='all' else np.nan, dtype=dtype)
+
+    for k in range(mz):
+        z0, z1 = k*fz, min((k+1)*fz, nz)
+        padded[:z1-z0, :ny, :nx] = val[z0:z1]
+        if z1-z0 < fz:
+            padded[z1-z0:] = 1. if method=='all' else np.nan
+
+        #Blocks along the last axis
+        blocks = padded.reshape(fz, my, fy, mx, fx).transpose(1, 3, 0, 2, 4).reshape(my, mx, nb)
+        valid  = ~np.isnan(blocks)
+        count  = valid.sum(axis=-1)
+
+        if method == 'mean':
+            slab = np.where(valid, blocks, 0).sum(axis=-1)/np.maximum(count, 1)
+
+        elif method == 'any':
+            slab = np.where((blocks==1).any(axis=-1), 1., np.nan)
+
+        elif method == 'all':
+            slab = np.where((blocks==1).all(axis=-1), 1., np.nan)
+
+        else:
+            #Length of the run of equal values ending at each position of the sorted blocks (nan last),
+            #the first maximum is the end of the run of the smallest most frequent value
+            blocks = np.sort(blocks, axis=-1)
+            index  = np.arange(nb, dtype=np.min_scalar_type(nb))
+            start  = np.ones(blocks.shape, dtype=bool)
+            start[..., 1:] = blocks[..., 1:] != blocks[..., :-1]
+            first  = np.maximum.accumulate(np.where(start, index, 0), axis=-1)
+            run    = np.where(np.isnan(blocks), 0, index-first+1)
+            slab   = np.take_along_axis(blocks, np.argmax(run, axis=-1)[..., np.newaxis], axis=-1)[..., 0]
+
+        slab[count==0] = np.nan
+        reduced[k]     = slab
+
+    return reduced
+
+
+########
+#2
+########
+def coarsen_img(image, methods, factor=2, axes='xy'):
+    '''
+    Create the coarse version of an Img object.
+    The origin is kept and the cell size is multiplied by factor along the reduced axes,
+    so the coarse cell (i, j, k) covers the fine cells (i*factor...(i+1)*factor-1, ...).
+
+    Inputs :
+    -----------
+    image : Img object.
+    methods : reduction method, one for all the variables or a list with one method per variable
+              (see block_reduce).
+    factor : number of cells of the block along each reduced axis.
+    axes : reduced axes, 'xy' or 'xyz'.
+
+    Outputs :
+    -----------
+    coarse : Img object at the coarse resolution.
+    '''
+
+    if isinstance(methods, str):
+        methods = [methods]*image.nv
+    if len(methods) != image.nv:
+        raise ValueError('one method per variable is required ({} variables)'.format(image.nv))
+
+    val = np.stack([block_reduce(image.val[iv], methods[iv], factor=factor, axes=axes) for iv in range(image.nv)])
+
+    fz = factor if 'z' in axes else 1
+    fy = factor if 'y' in axes else 1
+    fx = factor if 'x' in axes else 1
+
+    coarse = img.Img(nx=val.shape[3], ny=val.shape[2], nz=val.shape[1],
+                     sx=image.sx*fx, sy=image.sy*fy, sz=image.sz*fz,
+                     ox=image.ox, oy=image.oy, oz=image.oz,
+                     nv=image.nv, val=val, varname=image.varname, name=image.name)
+
+    return coarse
+
+
+########
+#3
+########
+def build_pyramid(image, pathPickle, methods, nlevels=3, axes='xy'):
+    '''
+    Build and store the coarse levels of an Img object.
+    The level k reduces the blocks of 2 cells of the level k-1, so each level costs a pass on the previous one
+    only. The mean and the mode of a level are thus those of the coarser blocks : they can differ from
+    the mean and mode of the 2^k full resolution cells (e.g. blocks with nan cells, ties of the mode),
+    use coarsen_img(image, methods, factor=2**k) for the direct reduction. The level k is stored as
+    <name>_level<k>.pickle in the folder of the full resolution file pathPickle (<name>.pickle).
+    The full resolution Img is written at pathPickle if this file does not exist yet.
+
+    Inputs :
+    -----------
+    image : full resolution Img object (level 0).
+    pathPickle : path of the full resolution pickle file (e.g. pathGSLIB+'grid3D.pickle').
+    methods : reduction method, one for all the variables or a list with one method per variable.
+    nlevels : number of coarse levels.
+    axes : reduced axes, 'xy' or 'xyz'.
+
+    Outputs :
+    -----------
+    paths : list of the paths of the levels (level 0 to nlevels).
+    '''
+
+    pyramid = ImgPyramid(pathPickle)
+    folder  = os.path.dirname(pathPickle)
+    if folder != '':
+        os.makedirs(folder, exist_ok=True)
+
+    if not os.path.exists(pathPickle):
+        with open(pathPickle, 'bw') as file:
+            pickle.dump(image, file, pickle.HIGHEST_PROTOCOL)
+
+    paths  = [pathPickle]
+    coarse = image
+    for level in range(1, nlevels+1):
+        coarse = coarsen_img(coarse, methods, factor=2, axes=axes)
+        path   = pyramid.path(level)
+        with open(path, 'bw') as file:
+            pickle.dump(coarse, file, pickle.HIGHEST_PROTOCOL)
+        paths.append(path)
+
+    print('*** Pyramid of {} : {} levels Done***'.format(pyramid.name, nlevels))
+
+    return paths
+
+
+########
+#4
+########
+class ImgPyramid:
+    '''
+    Lazy access to the levels of an Img stored with the build_pyramid function.
+    pyramid[k] loads the level k on first access and keeps it in memory,
+    the level 0 is the full resolution file <name>.pickle.
+
+    Inputs :
+    -----------
+    pathPickle : path of the full resolution pickle file, the levels are in the same folder.
+    '''
+
+    def __init__(self, pathPickle):
+        self.pathPyramid = os.path.dirname(pathPickle)
+        self.name        = os.path.splitext(os.path.basename(pathPickle))[0]
+        self._levels     = {}
+
+    def path(self, level):
+        if level == 0:
+            return os.path.join(self.pathPyramid, '{}.pickle'.format(self.name))
+        return os.path.join(self.pathPyramid, '{}_level{}.pickle'.format(self.name, level))
+
+    def levels(self):
+        '''
+        Sorted list of all the stored levels (the list can have gaps, e.g. [0, 1, 3]).
+        '''
+        pattern = re.compile(r'^{}_level(\d+)\.pickle$'.format(re.escape(self.name)))
+        levels  = [0] if os.path.exists(self.path(0)) else []
+        for fname in os.listdir(self.pathPyramid or '.'):
+            match = pattern.match(fname)
+            if match is not None and int(match.group(1)) > 0:
+                levels.append(int(match.group(1)))
+        return sorted(levels)
+
+    def __getitem__(self, level):
+        if level not in self._levels:
+            if not os.path.exists(self.path(level)):
+                raise KeyError('level {} of {} is not stored in {}'.format(level, self.name, self.pathPyramid))
+            with open(self.path(level), 'rb') as file:
+                self._levels[level] = pickle.load(file)
+        return self._levels[level]
+
+    def release(self, level=None):
+        '''
+        Free the memory of one level, or of all the levels if level is None.
+        '''
+        if level is None:
+            self._levels = {}
+        else:
+            self._levels.pop(level, None)
@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+#-*- coding: utf-8 -*-
+
+#10-2026
+
+########
+#Check the tiled functions against the in memory functions on a small random grid :
+#tiled_create3DGrid vs create3DGrid, tiled_broadcast_2D_to_3D vs the loop of the notebooks,
+#tiled_estimate vs ordinary_mesh_batch. The tiles have odd sizes, the surfaces have nan cells
+#and cells where the top is below the bottom.
+#Example :
+#   python checkTiling.py
+#   python checkTiling.py --tile-nx 37 --tile-ny 23 --workers 3
+#Exit status 1 if a tiled result differs from the in memory one.
+########
+
+import os
+import sys
+import argparse
+import tempfile
+
+pathTiling  = os.path.dirname(os.path.abspath(__file__))
+pathJupyter = os.path.dirname(pathTiling)
+
+exec(open(os.path.join(pathJupyter, 'grid_creation', 'functions', 'grid_creation_function.py')).read())
+exec(open(os.path.join(pathJupyter, 'rotation_map_creation', 'functions', 'rotation_map_creation_function.py')).read())
+exec(open(os.path.join(pathTiling, 'functions', 'grid_tiling_function.py')).read())
+
+
+parser = argparse.ArgumentParser(description='Check of the tiled functions against the in memory functions.')
+parser.add_argument('--nx', type=int, default=97, help='number of cells along x')
+parser.add_argument('--ny', type=int, default=83, help='number of cells along y')
+parser.add_argument('--tile-nx', type=int, default=37, help='tile size along x')
+parser.add_argument('--tile-ny', type=int, default=23, help='tile size along y')
+parser.add_argument('--workers', nargs='*', type=int, default=[1, 3], help='numbers of worker processes')
+parser.add_argument('--seed', type=int, default=0, help='seed of the random data')
+args = parser.parse_args()
+
+rng    = np.random.default_rng(args.seed)
+nx, ny = args.nx, args.ny
+sx, sy, sz = 100, 100, 2
+ox, oy     = 664328.1865, 6153000.2413
+
+#Surfaces with nan cells and cells where top<bottom
+bottom = rng.uniform(-250, -100, (ny, nx))
+top    = bottom+rng.uniform(-20, 100, (ny, nx))
+bottom[rng.random((ny, nx)) < 0.1] = np.nan
+top[rng.random((ny, nx)) < 0.05]   = np.nan
+topLayer    = img.Img(nx=nx, ny=ny, nz=1, sx=sx, sy=sy, sz=sz, ox=ox, oy=oy, oz=0, nv=1, val=top)
+bottomLayer = img.Img(nx=nx, ny=ny, nz=1, sx=sx, sy=sy, sz=sz, ox=ox, oy=oy, oz=0, nv=1, val=bottom)
+
+#Kriging data
+x     = ox+rng.uniform(0, nx*sx, 50)
+y     = oy+rng.uniform(0, ny*sy, 50)
+v     = rng.uniform(-100, 65, 50)
+model = lambda h: spherical(h, 850, 8000)
+
+def same(a, b):
+    return a.shape == b.shape and np.array_equal(a, b, equal_nan=True)
+
+failures = []
+with tempfile.TemporaryDirectory() as pathTmp:
+    grid3D, info = create3DGrid(topLayer, bottomLayer, os.path.join(pathTmp, 'memory_'))
+    mask         = grid3D.val[1]
+
+    #Notebook loop of the 2D to 3D broadcast
+    maps2D      = rng.uniform(-100, 65, (2, 3, ny, nx))
+    layer_index = rng.integers(-1, 3, grid3D.nz)
+    loop = np.full((2, grid3D.nz, ny, nx), np.nan)
+    for iv in range(2):
+        for z in range(grid3D.nz):
+            if layer_index[z] >= 0:
+                loop[iv, z][mask[z]==1] = maps2D[iv, layer_index[z]][mask[z]==1]
+
+    #In memory kriging on all the cells
+    X, Y = np.meshgrid(ox+(np.arange(nx)+0.5)*sx, oy+(np.arange(ny)+0.5)*sy)
+    v_est, v_var = ordinary_mesh_batch(x, y, v, X.ravel(), Y.ravel(), model)
+    krige = np.stack((v_est, v_var)).reshape(2, ny, nx)
+
+    for n_workers in args.workers:
+        tiled3D, tiledInfo = tiled_create3DGrid(topLayer, bottomLayer, os.path.join(pathTmp, 'tiled_'),
+                                                tile_nx=args.tile_nx, tile_ny=args.tile_ny, n_workers=n_workers)
+        geometry = [(g.nx, g.ny, g.nz, g.sx, g.sy, g.sz, g.ox, g.oy, g.oz) for g in (grid3D, tiled3D)]
+        if not same(np.asarray(tiled3D.val), grid3D.val) or geometry[0] != geometry[1]:
+            failures.append('tiled_create3DGrid ({} workers)'.format(n_workers))
+        if not same(tiledInfo.val, info.val):
+            failures.append('tiled_create3DGrid info ({} workers)'.format(n_workers))
+
+        broadcast = tiled_broadcast_2D_to_3D(maps2D, layer_index, mask, os.path.join(pathTmp, 'broadcast.npy'),
+                                             tile_nx=args.tile_nx, tile_ny=args.tile_ny, n_workers=n_workers)
+        if not same(np.asarray(broadcast), loop):
+            failures.append('tiled_broadcast_2D_to_3D ({} workers)'.format(n_workers))
+
+        factor    = ordinary_factor(x, y, model)
+        estimator = lambda xi, yi: ordinary_mesh_batch(x, y, v, xi, yi, model, factor=factor)
+        estimate  = tiled_estimate(estimator, nx, ny, sx, sy, ox, oy, os.path.join(pathTmp, 'krige.npy'),
+                                   tile_nx=args.tile_nx, tile_ny=args.tile_ny, n_workers=n_workers)
+        if not same(np.asarray(estimate), krige):
+            failures.append('tiled_estimate ({} workers)'.format(n_workers))
+        del tiled3D, broadcast, estimate
+
+print('*** Tiling check : {} mismatches on {} comparisons ***'.format(len(failures), 4*len(args.workers)))
+for failure in failures:
+    print('    {} differs from the in memory result'.format(failure))
+
+if len(failures) > 0:
+    sys.exit(1)
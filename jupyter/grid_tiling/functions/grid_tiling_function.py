@@ -0,0 +1,273 @@
+#!/usr/bin/python3
+#-*- coding: utf-8 -*-
+
+#10-2026
+
+
+########
+#The following functions process grids larger than the memory by lateral tiles.
+#The lateral domain (ny, nx) is partitioned in tiles with an optional halo, each tile is computed
+#by a kernel (in parallel worker processes) and written in a memory-mapped .npy output file.
+#The grid creation, the 2D to 3D broadcast of the auxiliary maps and the kriging estimation are provided,
+#they give the same values as the in memory functions (create3DGrid, notebooks loops, ordinary_mesh_batch),
+#see checkTiling.py. These three kernels are pointwise in the lateral plane and use no halo.
+########
+
+import pickle
+import multiprocessing
+import numpy as np
+
+from geone import img
+
+
+#Task shared with the worker processes (inherited by fork, so the kernels do not need to be pickled)
+_TASK = {}
+
+
+########
+#1
+########
+def make_tiles(nx, ny, tile_nx=256, tile_ny=256, halo=0):
+    '''
+    Partition the lateral domain in tiles.
+
+    Inputs :
+    -----------
+    nx, ny : lateral dimensions of the grid.
+    tile_nx, tile_ny : dimensions of the tiles (the last tiles can be smaller).
+    halo : number of cells added around each tile for the kernels needing the neighbouring cells
+           (e.g. smoothing, gradients), 0 for pointwise kernels such as the ones of this file.
+
+    Outputs :
+    -----------
+    tiles : list of dictionaries with the keys
+            core : (y0, y1, x0, x1) cells computed by the tile,
+            halo : (y0, y1, x0, x1) cells readable by the tile (core extended by the halo, clipped to the grid).
+    '''
+
+    tiles = []
+    for y0 in range(0, ny, tile_ny):
+        for x0 in range(0, nx, tile_nx):
+            y1, x1 = min(y0+tile_ny, ny), min(x0+tile_nx, nx)
+            tiles.append({'core':(y0, y1, x0, x1),
+                          'halo':(max(y0-halo, 0), min(y1+halo, ny), max(x0-halo, 0), min(x1+halo, nx))})
+
+    return tiles
+
+
+########
+#2
+########
+def _run_tiles(worker, nb_workers):
+    '''
+    Compute the tiles worker, worker+nb_workers, ... of the current task.
+    '''
+
+    out = np.load(_TASK['pathOut'], mmap_mode='r+')
+    for i in range(worker, len(_TASK['tiles']), nb_workers):
+        y0, y1, x0, x1 = _TASK['tiles'][i]['core']
+        out[..., y0:y1, x0:x1] = _TASK['kernel'](_TASK['tiles'][i])
+    out.flush()
+    del out
+
+    return
+
+
+def run_tiled(kernel, pathOut, shape, tiles, dtype=np.float64, n_workers=1):
+    '''
+    Run a kernel on each tile and write the results in a memory-mapped .npy file.
+    With n_workers>1 the tiles are shared between forked worker processes,
+    only the tile being computed is held in memory by each worker.
+
+    Inputs :
+    -----------
+    kernel : function kernel(tile) returning the array (..., y1-y0, x1-x0) of the tile core.
+    pathOut : path of the .npy output file.
+    shape : shape of the output, the last two dimensions are (ny, nx).
+    tiles : list of tiles, created with the make_tiles function.
+    dtype : type of the output values.
+    n_workers : number of worker processes (forked, serial computation if fork is not available).
+
+    Outputs :
+    -----------
+    out : memory-mapped output array (numpy.memmap).
+    '''
+
+    global _TASK
+
+    out = np.lib.format.open_memmap(pathOut, mode='w+', dtype=dtype, shape=tuple(shape))
+    del out
+
+    _TASK = {'kernel':kernel, 'pathOut':pathOut, 'tiles':tiles}
+    try:
+        if n_workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            context   = multiprocessing.get_context('fork')
+            processes = [context.Process(target=_run_tiles, args=(worker, n_workers)) for worker in range(n_workers)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            failed = [process.exitcode for process in processes if process.exitcode != 0]
+            if len(failed) > 0:
+                raise RuntimeError('{} tile worker(s) failed, exit codes {}'.format(len(failed), failed))
+        else:
+            _run_tiles(0, 1)
+    finally:
+        _TASK = {}
+
+    return np.load(pathOut, mmap_mode='r+')
+
+
+########
+#3
+########
+def tiled_create3DGrid(topLayer, bottomLayer, pathGSLIB, tile_nx=256, tile_ny=256, n_workers=1):
+    '''
+    Tiled version of the create3DGrid function, for grids larger than the memory.
+    The 3D grid is written in the memory-mapped file pathGSLIB+'grid3D.npy' (2, nz, ny, nx),
+    the shift values are stored in pathGSLIB+'grid3D_info.pickle'.
+    The values are identical to the create3DGrid ones. The cell size along y of the 3D grid is sy,
+    where create3DGrid uses sx for both lateral sizes (the grids only differ when sx!=sy).
+
+    Inputs :
+    -------------
+    topLayer : top topography of the grid, Img object.
+    bottomLayer : bottom topography of the grid, Img object.
+    pathGSLIB : path where to store the npy/pickle grid file.
+    tile_nx, tile_ny : dimensions of the tiles.
+    n_workers : number of worker processes.
+
+    Outputs :
+    -------------
+    One Img object with two variables (the grid and the transformed grid), its values are the memory-mapped array.
+    One Img object with one variable (the shift value for each cell).
+    '''
+
+    nx, ny     = topLayer.nx, topLayer.ny
+    ox, oy     = topLayer.ox, topLayer.oy
+    sx, sy, sz = topLayer.sx, topLayer.sy, topLayer.sz
+
+    top, bottom = topLayer.val[0, 0], bottomLayer.val[0, 0]
+
+    minDepth = np.nanmin(bottom)
+    maxDepth = np.nanmax(top)
+    nz       = int(np.ceil((maxDepth-minDepth)/sz))
+    oz       = float(minDepth)
+
+    #Cells where both top and bottom layers are informed and top>=bottom
+    with np.errstate(invalid='ignore'):
+        informed = ~np.isnan(bottom) & (top-bottom >= 0)
+    murLayer = np.where(informed, np.trunc((bottom-oz)/sz), np.nan)
+
+    def kernel(tile):
+        y0, y1, x0, x1 = tile['core']
+        valid = informed[y0:y1, x0:x1]
+        mur   = np.where(valid, murLayer[y0:y1, x0:x1], 0).astype(int)
+        thick = np.where(valid, np.ceil((top[y0:y1, x0:x1]-bottom[y0:y1, x0:x1])/sz), 0).astype(int)
+
+        k   = np.arange(nz)[:, np.newaxis, np.newaxis]
+        val = np.full((2, nz, y1-y0, x1-x0), np.nan)
+        val[0][valid & (k >= mur) & (k <= mur+thick)] = 1
+        val[1][valid & (k <= thick)] = 1
+        return val
+
+    tiles = make_tiles(nx, ny, tile_nx, tile_ny)
+    val   = run_tiled(kernel, pathGSLIB+'grid3D.npy', (2, nz, ny, nx), tiles, n_workers=n_workers)
+
+    grid3D = img.Img(nx=int(nx), ny=int(ny), nz=int(nz),
+                     sx=sx, sy=sy, sz=sz,
+                     ox=ox, oy=oy, oz=oz,
+                     nv=2, val=val, varname=['Pliocene', 'Transformation'])
+
+    grid2D_transfoInfo = img.Img(nx=int(nx), ny=int(ny), nz=1,
+                                 sx=sx, sy=sy, sz=sz,
+                                 ox=ox, oy=oy, oz=0,
+                                 nv=1, val=murLayer, varname='nb_layer_transfo')
+
+    with open(pathGSLIB+'grid3D_info.pickle', 'bw') as file:
+        pickle.dump(grid2D_transfoInfo, file, pickle.HIGHEST_PROTOCOL)
+
+    return grid3D, grid2D_transfoInfo
+
+
+########
+#4
+########
+def tiled_broadcast_2D_to_3D(maps2D, layer_index, mask, pathOut, tile_nx=256, tile_ny=256, n_workers=1,
+                             dtype=np.float64):
+    '''
+    Broadcast 2D auxiliary maps (trend, rotation) to a 3D grid under a mask, by tiles.
+    The layer z of the variable iv receives maps2D[iv, layer_index[z]] where mask[z]==1, nan elsewhere
+    (or everywhere when layer_index[z]<0). This is the loop of the notebooks :
+        rotationVal3D[0,z][mask.val[1,z]==1] = rotationVal[0,0][mask.val[1,z]==1]
+
+    Inputs :
+    -----------
+    maps2D : array (nv, nmaps, ny, nx) of the 2D maps.
+    layer_index : array (nz,) index of the 2D map of each layer, -1 for no map.
+    mask : array (nz, ny, nx), e.g. mask3D.val[1,:nz], can be a memory-mapped array (only the tiles are read).
+    pathOut : path of the .npy output file.
+    tile_nx, tile_ny : dimensions of the tiles.
+    n_workers : number of worker processes.
+    dtype : type of the output values (float32 halves the file size).
+
+    Outputs :
+    -----------
+    out : memory-mapped array (nv, nz, ny, nx).
+    '''
+
+    maps2D      = np.asarray(maps2D)
+    layer_index = np.asarray(layer_index, dtype=int)
+    nv, nmaps, ny, nx = maps2D.shape
+    nz = layer_index.size
+    if tuple(mask.shape) != (nz, ny, nx):
+        raise ValueError('mask shape {} differs from (nz, ny, nx) {}'.format(tuple(mask.shape), (nz, ny, nx)))
+
+    def kernel(tile):
+        y0, y1, x0, x1 = tile['core']
+        inside = (mask[:, y0:y1, x0:x1] == 1) & (layer_index >= 0)[:, np.newaxis, np.newaxis]
+        val    = maps2D[:, np.maximum(layer_index, 0), y0:y1, x0:x1]
+        return np.where(inside, val, np.nan).astype(dtype)
+
+    tiles = make_tiles(nx, ny, tile_nx, tile_ny)
+
+    return run_tiled(kernel, pathOut, (nv, nz, ny, nx), tiles, dtype=dtype, n_workers=n_workers)
+
+
+########
+#5
+########
+def tiled_estimate(estimator, nx, ny, sx, sy, ox, oy, pathOut, tile_nx=256, tile_ny=256, n_workers=1):
+    '''
+    Estimate a variable at the cell centres of a 2D grid, by tiles.
+    The estimator is called with the coordinates of the cells of each tile. The work shared by all the
+    tiles is done once before the call, e.g. for ordinary kriging the kriging matrix is factorized
+    in the parent process and the forked workers only build and solve the right-hand sides :
+        factor    = ordinary_factor(x, y, model_function)
+        estimator = lambda xi, yi: ordinary_mesh_batch(x, y, v, xi, yi, model_function, factor=factor)
+    The values are those of the estimator called on all the cells at once.
+
+    Inputs :
+    -----------
+    estimator : function estimator(xi, yi) returning (v_est, v_var) at the points (xi, yi).
+    nx, ny, sx, sy, ox, oy : geometry of the 2D grid.
+    pathOut : path of the .npy output file.
+    tile_nx, tile_ny : dimensions of the tiles.
+    n_workers : number of worker processes.
+
+    Outputs :
+    -----------
+    out : memory-mapped array (2, ny, nx) of the estimated values and of the estimation variances.
+    '''
+
+    def kernel(tile):
+        y0, y1, x0, x1 = tile['core']
+        xG = ox+(np.arange(x0, x1)+0.5)*sx
+        yG = oy+(np.arange(y0, y1)+0.5)*sy
+        X, Y = np.meshgrid(xG, yG)
+        v_est, v_var = estimator(X.ravel(), Y.ravel())
+        return np.stack((v_est, v_var)).reshape(2, y1-y0, x1-x0)
+
+    tiles = make_tiles(nx, ny, tile_nx, tile_ny)
+
+    return run_tiled(kernel, pathOut, (2, ny, nx), tiles, n_workers=n_workers)
@@ -0,0 +1,39 @@
+#!/usr/bin/python3
+#-*- coding: utf-8 -*-
+
+#10-2026
+
+########
+#Check the point store queries against the pandas boolean masks on a point table.
+#Example :
+#   python checkPointStore.py                                  (hd_merge.csv of the repository)
+#   python checkPointStore.py --csv points.csv --queries 500
+#Exit status 1 if a query differs from pandas.
+########
+
+import os
+import sys
+import argparse
+import tempfile
+
+pathPointStore = os.path.dirname(os.path.abspath(__file__))
+pathRepository = os.path.dirname(os.path.dirname(pathPointStore))
+
+exec(open(os.path.join(pathPointStore, 'functions', 'point_store_function.py')).read())
+
+
+parser = argparse.ArgumentParser(description='Check of the point store queries against pandas.')
+parser.add_argument('--csv', default=os.path.join(pathRepository, 'data', 'hard_data', 'hd_merge.csv'),
+                    help='csv file of the points')
+parser.add_argument('--queries', type=int, default=100, help='number of queries of each type')
+parser.add_argument('--size', type=float, default=100, help='size of the boxes and radius of the circles')
+parser.add_argument('--seed', type=int, default=0, help='seed of the query anchors')
+args = parser.parse_args()
+
+table = pd.read_csv(args.csv)
+with tempfile.TemporaryDirectory() as pathStore:
+    store      = create_point_store(table, pathStore)
+    mismatches = check_point_store(table, store, nb_queries=args.queries, size=args.size, seed=args.seed)
+
+if mismatches > 0:
+    sys.exit(1)
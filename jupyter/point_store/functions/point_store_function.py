@@ -0,0 +1,380 @@
+#!/usr/bin/python3
+#-*- coding: utf-8 -*-
+
+#10-2026
+
+
+########
+#The following functions convert the point tables (hard data, rotation points...) to a binary columnar store,
+#so they are read once from the csv and then memory-mapped, with a spatial index for the region queries.
+#The points are sorted along a Morton (Z-order) key of their x, y coordinates : the points of a cell
+#of the index grid (bucket) are contiguous, a query only reads the buckets intersecting the region.
+#The non-integer coordinates are stored in float64, so the queries and the returned values are exactly those
+#of the csv (float32 would only give a cm precision for an extent of 400 km). The integer columns, coordinates
+#included (e.g. an integer Z), are stored in the smallest integer type holding them, the other columns as float32.
+########
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+
+#Number of bits of the Morton key along each axis
+MORTON_BITS = 16
+
+
+########
+#1
+########
+def morton_key(ix, iy):
+    '''
+    Morton (Z-order) key of cell indices, the bits of ix and iy are interleaved.
+
+    Inputs :
+    -----------
+    ix, iy : arrays of cell indices (< 2^16).
+
+    Outputs :
+    -----------
+    key : array of uint64 keys.
+    '''
+
+    def part1by1(v):
+        v = np.asarray(v).astype(np.uint64) & np.uint64(0xFFFFFFFF)
+        v = (v | (v << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+        v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+        v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+        v = (v | (v << np.uint64(2))) & np.uint64(0x3333333333333333)
+        v = (v | (v << np.uint64(1))) & np.uint64(0x5555555555555555)
+        return v
+
+    return part1by1(ix) | (part1by1(iy) << np.uint64(1))
+
+
+########
+#2
+########
+def _compact_column(values):
+    '''
+    Smallest storage type of a column : int8, int16, int32 or int64 for integers, float32 otherwise.
+    '''
+
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.integer) or np.issubdtype(values.dtype, np.bool_):
+        if values.size == 0:
+            return values.astype(np.int8)
+        for dtype in [np.int8, np.int16, np.int32]:
+            if values.min() >= np.iinfo(dtype).min and values.max() <= np.iinfo(dtype).max:
+                return values.astype(dtype)
+        return values.astype(np.int64)
+
+    return values.astype(np.float32)
+
+
+def create_point_store(table, pathStore, x='X', y='Y', z='Z', level=None):
+    '''
+    Convert a point table to a binary columnar store.
+    The store is a folder with one .npy file per column, the index files and a meta.json file.
+
+    Inputs :
+    -----------
+    table : DataFrame or path to a csv file (e.g. hd_merge.csv, rotationPointsSet.csv).
+    pathStore : folder of the store.
+    x, y : names of the coordinate columns.
+    z : name of the vertical coordinate column, None if there is none (e.g. rotation points).
+    level : the index grid has 2^level x 2^level buckets,
+            by default about 32 points per bucket (level between 1 and 10).
+
+    Outputs :
+    -----------
+    store : PointStore object of the created store.
+    '''
+
+    if isinstance(table, str):
+        table = pd.read_csv(table)
+
+    n = len(table)
+    if level is None:
+        level = int(np.clip(np.ceil(np.log(max(n, 1)/32)/np.log(4)), 1, 10))
+
+    xv = table[x].values.astype(np.float64)
+    yv = table[y].values.astype(np.float64)
+    ox, oy = float(xv.min()), float(yv.min())
+    lx = max(float(xv.max())-ox, 1e-9)
+    ly = max(float(yv.max())-oy, 1e-9)
+
+    #Morton key of the points at the finest resolution, the buckets are the first 2*level bits
+    nb_cells = 2**MORTON_BITS
+    ix  = np.minimum(((xv-ox)/lx*nb_cells).astype(np.int64), nb_cells-1)
+    iy  = np.minimum(((yv-oy)/ly*nb_cells).astype(np.int64), nb_cells-1)
+    key = morton_key(ix, iy)
+    order = np.argsort(key, kind='stable')
+    key   = key[order]
+
+    os.makedirs(pathStore, exist_ok=True)
+
+    #Columns
+    coordinates = [x, y] if z is None else [x, y, z]
+    columns     = {}
+    for name in table.columns:
+        values = table[name].values[order]
+        if name in coordinates and not np.issubdtype(values.dtype, np.integer):
+            values = values.astype(np.float64)
+        else:
+            values = _compact_column(values)
+        np.save(os.path.join(pathStore, '{}.npy'.format(name)), values)
+        columns[name] = str(values.dtype)
+
+    #Bucket index : the points of the bucket b are the rows offsets[b] to offsets[b+1]
+    bucket  = key >> np.uint64(2*(MORTON_BITS-level))
+    offsets = np.searchsorted(bucket, np.arange(4**level+1, dtype=np.uint64)).astype(np.int64)
+    np.save(os.path.join(pathStore, '_bucket_offsets.npy'), offsets)
+
+    #Vertical index : rows sorted by z
+    if z is not None:
+        zv      = np.load(os.path.join(pathStore, '{}.npy'.format(z)))
+        z_order = np.argsort(zv, kind='stable').astype(np.int32 if n < 2**31 else np.int64)
+        np.save(os.path.join(pathStore, '_z_order.npy'), z_order)
+        np.save(os.path.join(pathStore, '_z_sorted.npy'), zv[z_order])
+
+    meta = {'n':n, 'x':x, 'y':y, 'z':z, 'origin':[ox, oy], 'extent':[lx, ly],
+            'level':level, 'columns':columns}
+    with open(os.path.join(pathStore, 'meta.json'), 'w') as file:
+        json.dump(meta, file, indent=2)
+
+    print('*** Point store of {} points Done***'.format(n))
+
+    return PointStore(pathStore)
+
+
+########
+#3
+########
+class PointStore:
+    '''
+    Memory-mapped access to a point store created with the create_point_store function.
+    The queries return the sorted row numbers of the points, the values are read with the take function.
+    The limits are inclusive and tested in float64 on the stored coordinates, as the pandas boolean masks
+    table[(table['X']>=xmin) & (table['X']<=xmax) & ...] would do.
+
+    Inputs :
+    -----------
+    pathStore : folder of the store.
+    '''
+
+    def __init__(self, pathStore):
+        self.pathStore = pathStore
+        with open(os.path.join(pathStore, 'meta.json'), 'r') as file:
+            self.meta = json.load(file)
+
+        self.columns = {name:np.load(os.path.join(pathStore, '{}.npy'.format(name)), mmap_mode='r')
+                        for name in self.meta['columns']}
+        self.offsets = np.load(os.path.join(pathStore, '_bucket_offsets.npy'), mmap_mode='r')
+        if self.meta['z'] is not None:
+            self.z_order  = np.load(os.path.join(pathStore, '_z_order.npy'), mmap_mode='r')
+            self.z_sorted = np.load(os.path.join(pathStore, '_z_sorted.npy'), mmap_mode='r')
+
+    def __len__(self):
+        return self.meta['n']
+
+    def take(self, rows, columns=None):
+        '''
+        Values of the points of the given rows.
+
+        Inputs :
+        -----------
+        rows : array of row numbers (or slice).
+        columns : list of the columns to read, all by default.
+
+        Outputs :
+        -----------
+        points : DataFrame of the points.
+        '''
+
+        if columns is None:
+            columns = list(self.meta['columns'])
+
+        return pd.DataFrame({name:self.columns[name][rows] for name in columns}, columns=columns)
+
+    def _bucket_rows(self, xmin, xmax, ymin, ymax):
+        '''
+        Rows of the buckets intersecting the box and flag of the buckets fully inside.
+        '''
+
+        level  = self.meta['level']
+        nb     = 2**level
+        lx, ly = self.meta['extent']
+        ox, oy = self.meta['origin']
+        xmin, xmax, ymin, ymax = xmin-ox, xmax-ox, ymin-oy, ymax-oy
+
+        if xmax < 0 or ymax < 0 or xmin > lx or ymin > ly or xmin > xmax or ymin > ymax:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+
+        #Margin for the rounding of the relative coordinates at the borders of the buckets
+        tol = 1e-6*max(lx, ly)
+
+        ix0, ix1 = np.clip(np.floor(np.array([xmin-tol, xmax+tol])/lx*nb).astype(np.int64), 0, nb-1)
+        iy0, iy1 = np.clip(np.floor(np.array([ymin-tol, ymax+tol])/ly*nb).astype(np.int64), 0, nb-1)
+
+        ix, iy = np.meshgrid(np.arange(ix0, ix1+1), np.arange(iy0, iy1+1))
+        ix, iy = ix.ravel(), iy.ravel()
+        bucket = morton_key(ix, iy).astype(np.int64)
+        start  = np.asarray(self.offsets[bucket])
+        stop   = np.asarray(self.offsets[bucket+1])
+
+        #A bucket fully inside the box does not need the exact test
+        inside = ((ix*lx/nb-tol >= xmin) & ((ix+1)*lx/nb+tol <= xmax) &
+                  (iy*ly/nb-tol >= ymin) & ((iy+1)*ly/nb+tol <= ymax))
+
+        keep   = stop > start
+        start, stop, inside = start[keep], stop[keep], inside[keep]
+        sort   = np.argsort(start)
+        start, stop, inside = start[sort], stop[sort], inside[sort]
+
+        length = stop-start
+        rows   = np.arange(length.sum())+np.repeat(start-(np.cumsum(length)-length), length)
+
+        return rows, np.repeat(inside, length)
+
+    def bbox(self, xmin, xmax, ymin, ymax, zmin=None, zmax=None):
+        '''
+        Rows of the points inside a box, xmin<=x<=xmax, ymin<=y<=ymax (and zmin<=z<=zmax).
+
+        Inputs :
+        -----------
+        xmin, xmax, ymin, ymax : limits of the box in the original coordinate system.
+        zmin, zmax : vertical limits, None for no limit.
+
+        Outputs :
+        -----------
+        rows : sorted array of the row numbers.
+        '''
+
+        x, y = self.meta['x'], self.meta['y']
+
+        rows, inside = self._bucket_rows(xmin, xmax, ymin, ymax)
+
+        #Exact test for the points of the buckets crossing the border of the box
+        border = ~inside
+        xb = self.columns[x][rows[border]]
+        yb = self.columns[y][rows[border]]
+        inside[border] = (xb >= xmin) & (xb <= xmax) & (yb >= ymin) & (yb <= ymax)
+        rows = rows[inside]
+
+        if zmin is not None or zmax is not None:
+            rows = rows[self._z_test(self.columns[self.meta['z']][rows], zmin, zmax)]
+
+        return rows
+
+    def radius(self, xc, yc, r, zmin=None, zmax=None):
+        '''
+        Rows of the points at a lateral distance lower or equal to r of (xc, yc) (and zmin<=z<=zmax).
+
+        Inputs :
+        -----------
+        xc, yc : centre in the original coordinate system.
+        r : radius.
+        zmin, zmax : vertical limits, None for no limit.
+
+        Outputs :
+        -----------
+        rows : sorted array of the row numbers.
+        '''
+
+        x, y = self.meta['x'], self.meta['y']
+
+        rows, _ = self._bucket_rows(xc-r, xc+r, yc-r, yc+r)
+        dx = self.columns[x][rows]-xc
+        dy = self.columns[y][rows]-yc
+        rows = rows[dx**2+dy**2 <= r**2]
+
+        if zmin is not None or zmax is not None:
+            rows = rows[self._z_test(self.columns[self.meta['z']][rows], zmin, zmax)]
+
+        return rows
+
+    def zslab(self, zmin=None, zmax=None):
+        '''
+        Rows of the points with zmin<=z<=zmax, from the vertical index.
+
+        Inputs :
+        -----------
+        zmin, zmax : vertical limits in the original coordinate system, None for no limit.
+
+        Outputs :
+        -----------
+        rows : sorted array of the row numbers.
+        '''
+
+        if self.meta['z'] is None:
+            raise ValueError('the store has no z column')
+
+        i0 = 0 if zmin is None else np.searchsorted(self.z_sorted, zmin, side='left')
+        i1 = len(self) if zmax is None else np.searchsorted(self.z_sorted, zmax, side='right')
+
+        return np.sort(self.z_order[i0:i1])
+
+    def _z_test(self, zv, zmin, zmax):
+        keep = np.ones(zv.shape, dtype=bool)
+        if zmin is not None:
+            keep &= zv >= zmin
+        if zmax is not None:
+            keep &= zv <= zmax
+        return keep
+
+
+########
+#4
+########
+def check_point_store(table, store, nb_queries=100, size=100, seed=0):
+    '''
+    Compare the queries of a point store to the pandas boolean masks on the original table.
+    The boxes and the circles are anchored at the coordinates of points of the table
+    (so points lie exactly on their borders), the radius 0 query must return the point itself.
+
+    Inputs :
+    -----------
+    table : DataFrame or path to the csv file used to create the store.
+    store : PointStore object of the table.
+    nb_queries : number of queries of each type.
+    size : size of the boxes and radius of the circles.
+    seed : seed of the random generator.
+
+    Outputs :
+    -----------
+    mismatches : number of queries whose rows or values differ from the pandas result.
+    '''
+
+    if isinstance(table, str):
+        table = pd.read_csv(table)
+
+    x, y, z = store.meta['x'], store.meta['y'], store.meta['z']
+    columns = list(table.columns)
+    rng     = np.random.default_rng(seed)
+    anchors = rng.integers(0, len(table), nb_queries)
+
+    def same(rows, mask):
+        expected = table[mask].sort_values(columns).reset_index(drop=True)
+        points   = store.take(rows)[columns].sort_values(columns).reset_index(drop=True)
+        return len(points) == len(expected) and bool((points == expected).all().all())
+
+    mismatches = 0
+    for i in anchors:
+        xc, yc = table[x].values[i], table[y].values[i]
+        mask   = (table[x]>=xc) & (table[x]<=xc+size) & (table[y]>=yc) & (table[y]<=yc+size)
+        mismatches += not same(store.bbox(xc, xc+size, yc, yc+size), mask)
+
+        for r in [0, size]:
+            mask = (table[x]-xc)**2+(table[y]-yc)**2 <= r**2
+            mismatches += not same(store.radius(xc, yc, r), mask)
+
+        if z is not None:
+            zc   = table[z].values[i]
+            mask = (table[z]>=zc) & (table[z]<=zc+size/10)
+            mismatches += not same(store.zslab(zc, zc+size/10), mask)
+
+    print('*** Point store check : {} mismatches on {} queries ***'.format(mismatches,
+                                                                          nb_queries*(4 if z is not None else 3)))
+
+    return mismatches
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+#-*- coding: utf-8 -*-
+
+#10-2026
+
+########
+#Check the rotation maps created with the rotation_maps function :
+#the angles of rotationPointsSet.csv keep their convention (-100 to 65 degrees),
+#and a cluster of orientations crossing the wrap (88 to 98 degrees, stored as 88...89.7 and -89.7...-82)
+#gives continuous maps, without jump of 180 degrees.
+#Example :
+#   python checkRotationMaps.py
+#Exit status 1 if a check fails.
+########
+
+import os
+import sys
+import pandas as pd
+
+pathRotation = os.path.dirname(os.path.abspath(__file__))
+
+exec(open(os.path.join(pathRotation, 'functions', 'rotation_map_creation_function.py')).read())
+
+
+model = lambda h: spherical(h, 850, 8000)
+nx, ny, sx, sy = 409, 512, 100, 100
+ox, oy         = 664328.1865, 6153000.2413
+
+def max_jump(angle3D):
+    '''
+    Largest difference between two neighbouring cells of the maps.
+    '''
+    return max(np.nanmax(np.abs(np.diff(angle3D, axis=1)), initial=0),
+               np.nanmax(np.abs(np.diff(angle3D, axis=2)), initial=0))
+
+failures = []
+
+#Rotation points of the repository
+points = pd.read_csv(os.path.join(pathRotation, 'data', 'rotationPointsSet.csv'))
+x, y, angle = points['x'].values, points['y'].values, points['angle'].values
+angle_min   = circular_window(angle)
+_, angle3D  = rotation_maps(x, y, angle, model, nx, ny, sx, sy, ox, oy)
+if not np.all((angle >= angle_min) & (angle < angle_min+180)):
+    failures.append('rotationPointsSet.csv : data outside the window [{}, {})'.format(angle_min, angle_min+180))
+print('rotationPointsSet.csv : window [{:.1f}, {:.1f}), maps in [{:.1f}, {:.1f}], largest jump {:.1f}'.format(
+      angle_min, angle_min+180, np.nanmin(angle3D), np.nanmax(angle3D), max_jump(angle3D)))
+
+#Cluster of orientations from 88 to 98 degrees along x, stored in [-90, 90)
+xw     = ox+np.linspace(0.05, 0.95, 60)*nx*sx
+yw     = oy+np.tile([0.3, 0.7], 30)*ny*sy
+true   = np.linspace(88, 98, 60)
+stored = (true+90) % 180-90
+_, angle3D = rotation_maps(xw, yw, stored, model, nx, ny, sx, sy, ox, oy)
+jump       = max_jump(angle3D)
+unwrapped  = (angle3D-88+45) % 180-45+88
+if jump > 10:
+    failures.append('wrap cluster : jump of {:.1f} degrees between neighbouring cells'.format(jump))
+if np.nanmin(unwrapped) < 80 or np.nanmax(unwrapped) > 106:
+    failures.append('wrap cluster : kriged orientations outside 88 to 98 degrees')
+print('wrap cluster : maps in [{:.1f}, {:.1f}], largest jump {:.1f}'.format(np.nanmin(angle3D),
+                                                                            np.nanmax(angle3D), jump))
+
+print('*** Rotation maps check : {} failures ***'.format(len(failures)))
+for failure in failures:
+    print('    {}'.format(failure))
+
+if len(failures) > 0:
+    sys.exit(1)
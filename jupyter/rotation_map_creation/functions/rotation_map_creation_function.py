@@ -49,33 +49,21 @@ def experimental(hc, gc, lag, nlag):
     variogram_range = nlag * lag #must represent your entire domain
     he = np.linspace(lag / 2, variogram_range - lag / 2, nlag) #x axis creation
 
-    # sum of gamma for a given interval
-    gamma_cum = np.zeros(nlag)
-    
-    # number of points in a given interval
-    num_points = np.zeros(nlag)
-    N = hc.shape[0] #return le nombre de point dans le vecteur distance
-    
-    # assign values to bins
-    for i in np.arange(0, N): #np.arange environ = à range()
-        if (hc[i] < variogram_range): #normalement tjs le cas
-            if hc[i] < 0:             #normalement tjs le cas
-                raise ValueError('Input must be a positive array')
-                
-            class_index = int((hc[i] / variogram_range) * nlag) #defini dans qu'elle intervalle on place la valeur 
-            num_points[class_index] += 1 #on incrémente l'intervalle
-            gamma_cum[class_index] += gc[i] #la somme des différence 
-    
-    #the value of the experimental variogramme
+    # class of each pair of points, only the pairs closer than the range are kept
+    inside = hc < variogram_range
+    if np.any(hc[inside] < 0):
+        raise ValueError('Input must be a positive array')
+    class_index = ((hc[inside] / variogram_range) * nlag).astype(int) #defini dans qu'elle intervalle on place la valeur
+
+    # number of points and sum of gamma for a given interval
+    num_points = np.bincount(class_index, minlength=nlag).astype(float)
+    gamma_cum = np.bincount(class_index, weights=gc[inside], minlength=nlag)
+
+    # the value of the experimental variogramme, mean of each interval (0 for empty intervals)
     ge = np.zeros(nlag)
-    
-    # compute mean, avoid division by 0
-    for j in np.arange(0, nlag):
-        if num_points[j] != 0:
-            ge[j] = gamma_cum[j] / num_points[j] #somme des diff / par le nombre de point dans l'intervalle
-        else:
-            ge[j] = 0.0
-            
+    filled = num_points != 0
+    ge[filled] = gamma_cum[filled] / num_points[filled] #somme des diff / par le nombre de point dans l'intervalle
+
     return he, ge
 
 
@@ -243,6 +231,62 @@ def ordinary_mesh(x, y, v, xi, yi, model_function):
     return v_est, v_var
 
 
+############################################
+############################################
+
+def ordinary_factor(x, y, model_function):
+    """
+    LU factorization of the ordinary kriging matrix, to be shared by
+    several calls of ordinary_mesh_batch with the same data points
+    Arguments:
+      x,y : the data points
+      model_function: variogram model function
+    Results:
+      factor : (lu, piv) as returned by scipy.linalg.lu_factor
+    """
+    G = _G_matrix(x, y, model_function)
+    return lu_factor(G)
+
+
+############################################
+############################################
+
+def ordinary_mesh_batch(x, y, v, xi, yi, model_function, batch_size=10000, factor=None):
+    """
+    Ordinary kriging on a mesh, vectorized by batches of points.
+    The kriging matrix is factorized once and the weights of all the points
+    of a batch are solved together.
+    Arguments:
+      x,y,v : the data points, v can be an array (n, k) of k variables
+              measured at the same locations (kriged with the same weights)
+      xi,yi : the points where a kriging interpolation is requested
+      model_function: variogram model function
+      batch_size : number of points solved together (bounds the memory)
+      factor : factorization of the kriging matrix computed with ordinary_factor,
+               computed here if None (pass it when the function is called on many tiles)
+    Results:
+      v_est : array of estimated values at locations (xi,yi), (m,) or (m, k)
+      v_var : array of kriging variances at locations (xi,yi)
+    """
+    n = x.shape[0]
+    if factor is None:
+        factor = ordinary_factor(x, y, model_function)
+    lu, piv = factor
+    nb_points = xi.shape[0]
+    v_est = np.zeros((nb_points,) + np.shape(v)[1:])
+    v_var = np.zeros(nb_points)
+    for start in np.arange(0, nb_points, batch_size):
+        stop = min(start + batch_size, nb_points)
+        h = np.sqrt((xi[np.newaxis, start:stop] - x[:, np.newaxis])**2 +
+                    (yi[np.newaxis, start:stop] - y[:, np.newaxis])**2)
+        g = np.ones((n + 1, stop - start))
+        g[0:-1] = -model_function(h)
+        lambda_mat = lu_solve((lu, piv), g)
+        v_est[start:stop] = np.einsum('ij,i...->j...', lambda_mat[0:-1], v)
+        v_var[start:stop] = np.einsum('ij,ij->j', -lambda_mat, g)
+    return v_est, v_var
+
+
 ############################################
 ############################################
 
@@ -272,3 +316,139 @@ def simple(x, y, v, xi, yi, covmodel, mu):
     v_var = covmodel(0)-np.sum(l*c)
     return v_est, v_var
 
+
+
+############################################
+############################################
+
+def circular_cloud(x, y, angle, period=180):
+    """
+    Computes cloud variogram of angles.
+    The difference of two angles is the shortest one on the circle,
+    e.g. 0.5*10**2 for -85 and 85 with a period of 180 degrees (orientations).
+    Arguments:
+      x, y : vectors containing the coordinates of the points
+      angle : vector containing the angles (degrees) at those locations
+      period : period of the angles, 180 for orientations, 360 for directions
+    Results:
+      hc : vector of contains the lag values (distances)
+      gc : vector of squared differences of angles
+    """
+    X = np.column_stack((x, y))
+    hc = distance.pdist(X)
+    diff = distance.pdist(np.asarray(angle, dtype=float)[:, np.newaxis])
+    diff = np.abs((diff + period / 2) % period - period / 2) #shortest difference on the circle
+    gc = 0.5 * diff ** 2
+    return (hc, gc)
+
+
+############################################
+############################################
+
+def circular_mean(angle, period=180):
+    """
+    Mean of angles (degrees) with the given period
+    """
+    k = 2 * np.pi / period
+    return np.arctan2(np.mean(np.sin(k * angle)), np.mean(np.cos(k * angle))) / k
+
+
+############################################
+############################################
+
+def circular_window(angle, period=180):
+    """
+    Start of the window [angle_min, angle_min+period) used to express angles.
+    The angles keep their own convention, the window is centred on their range, when they span less
+    than period and have no gap wider than period/2 (e.g. -100 to 65 degrees). Otherwise the given
+    convention splits a cluster of angles (e.g. 88 to 98 degrees stored as 88...89.7 and -89.7...-82)
+    and the window starts in the middle of the largest gap between the angles on the circle,
+    shifted by a multiple of period to contain most of the angles as they are given.
+    Arguments:
+      angle : vector of angles (degrees)
+      period : period of the angles, 180 for orientations, 360 for directions
+    Results:
+      angle_min : start of the window (degrees)
+    """
+    angle = np.asarray(angle, dtype=float)
+    a = np.sort(angle)
+    if a[-1] - a[0] < period and np.max(np.diff(a), initial=0) <= period / 2:
+        return (a[0] + a[-1]) / 2 - period / 2
+    #middle of the largest gap on the circle
+    a = np.sort(angle % period)
+    gaps = np.diff(np.append(a, a[0] + period))
+    i = np.argmax(gaps)
+    start = a[i] + gaps[i] / 2
+    #shift keeping the largest number of angles unchanged
+    shifts = np.arange(np.floor((a[0] - start) / period) - 1, np.ceil((angle.max() - start) / period) + 1)
+    inside = [np.sum((angle >= start + k * period) & (angle < start + (k + 1) * period)) for k in shifts]
+    return start + shifts[np.argmax(inside)] * period
+
+
+############################################
+############################################
+
+def rotation_maps(x, y, angle, model_function, nx, ny, sx, sy, ox, oy,
+                  mask=None, tolerance=10, period=180, angle_min=None, batch_size=10000):
+    """
+    Rotation maps from a set of angles, kriged on the cell centres of a 2D grid.
+    The angles are kriged through their components (cos(k*angle), sin(k*angle)), with k=360/period,
+    both components are kriged with the same weights (one factorization of the kriging matrix),
+    so the interpolation is continuous across the wrap of the angles.
+    The kriged angle and the minimum and maximum rotation maps (angle-tolerance, angle+tolerance)
+    are broadcast to the 3D grid under the mask, as used by DeeSse for a tolerance on the rotation.
+    Arguments:
+      x, y, angle : the data points, angles in degrees
+      model_function : variogram model function (the kriging weights do not depend on its sill)
+      nx, ny, sx, sy, ox, oy : geometry of the 2D grid
+      mask : array (nz, ny, nx) of the 3D grid, e.g. mask.val[1,:125], the maps are set where mask==1,
+             only the columns with at least one cell in the mask are kriged.
+             If None the maps are computed on all the cells and returned with nz=1
+      tolerance : half width of the rotation tolerance (degrees)
+      period : period of the angles, 180 for orientations, 360 for directions
+      angle_min : the angles are returned in [angle_min, angle_min+period),
+                  by default the data keep their own convention (e.g. -100 to 65 degrees) unless it splits
+                  a cluster of angles around the wrap, the window then starts in the largest gap between
+                  the data on the circle (see circular_window)
+      batch_size : number of points solved together (bounds the memory)
+    Results:
+      rotation3D : float32 array (2, nz, ny, nx), minimum and maximum rotation maps, nan outside the mask
+      angle3D : float32 array (nz, ny, nx) of the kriged angle, nan outside the mask
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    angle = np.asarray(angle, dtype=float)
+    k = 2 * np.pi / period
+    if angle_min is None:
+        angle_min = circular_window(angle, period)
+
+    #cells to krige
+    if mask is None:
+        columns = np.ones((ny, nx), dtype=bool)
+    else:
+        columns = np.any(mask == 1, axis=0)
+    iy, ix = np.nonzero(columns)
+    xi = ox + (ix + 0.5) * sx
+    yi = oy + (iy + 0.5) * sy
+
+    #kriging of the two components with the same weights
+    components = np.column_stack((np.cos(k * angle), np.sin(k * angle)))
+    est, _ = ordinary_mesh_batch(x, y, components, xi, yi, model_function, batch_size=batch_size)
+    angle_est = np.arctan2(est[:, 1], est[:, 0]) / k
+    angle_est = (angle_est - angle_min) % period + angle_min
+
+    angle2D = np.full((ny, nx), np.nan, dtype=np.float32)
+    angle2D[iy, ix] = angle_est
+
+    #angle, minimum and maximum rotation under the mask
+    if mask is None:
+        inside = columns[np.newaxis]
+    else:
+        inside = mask == 1
+    angle3D = np.full(inside.shape, np.nan, dtype=np.float32)
+    angle3D[inside] = np.broadcast_to(angle2D, inside.shape)[inside]
+    rotation3D = np.full((2,) + inside.shape, np.nan, dtype=np.float32)
+    rotation3D[0] = angle3D - tolerance
+    rotation3D[1] = angle3D + tolerance
+
+    return rotation3D, angle3D
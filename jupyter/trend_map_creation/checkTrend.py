@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+#-*- coding: utf-8 -*-
+
+#10-2026
+
+########
+#Check the batch post-processing of the head outputs on synthetic data (see jupyter/benchmark) :
+#read_head_file vs flopy HeadFile on a file with several times and layers,
+#heads_to_trend vs the loop of the createTrendMap notebook (get_head, mf_to_geone, broadcast to 3D),
+#with one mesh per simulation and with one mesh shared by all the simulations.
+#Example :
+#   python checkTrend.py
+#   python checkTrend.py --scale 1
+#Exit status 1 if a batch result differs from the flopy / notebook one.
+########
+
+import os
+import io
+import sys
+import argparse
+import tempfile
+import contextlib
+import flopy
+
+pathTrend     = os.path.dirname(os.path.abspath(__file__))
+pathJupyter   = os.path.dirname(pathTrend)
+pathBenchmark = os.path.join(pathJupyter, 'benchmark')
+
+exec(open(os.path.join(pathBenchmark, 'functions', 'synthetic_data_function.py')).read())
+exec(open(os.path.join(pathBenchmark, 'functions', 'benchmark_function.py')).read())
+
+
+parser = argparse.ArgumentParser(description='Check of the batch head post-processing against flopy and the notebook loop.')
+parser.add_argument('--scale', type=float, default=0.1, help='scale of the synthetic data')
+parser.add_argument('--seed', type=int, default=0, help='seed of the synthetic data')
+args = parser.parse_args()
+
+scale = int(args.scale) if float(args.scale).is_integer() else args.scale
+
+def trend_loop(trend, grid3D, meshes, paths, layers):
+    '''
+    Loop of the createTrendMap notebook.
+    '''
+    trends = []
+    for i, layer in enumerate(layers):
+        mask2D = img.Img(nx=grid3D.nx, ny=grid3D.ny, nz=1,
+                         ox=grid3D.ox, oy=grid3D.oy, oz=0,
+                         sx=grid3D.sx, sy=grid3D.sy,
+                         nv=1, val=grid3D.val[1, layer, :, :])
+        head = trend['get_head'](path=paths[i])
+        trends.append(trend['mf_to_geone'](meshes[i], head, mask=mask2D))
+
+    order     = np.argsort(layers)
+    trend_map = np.full((1, 125, grid3D.ny, grid3D.nx), np.nan)
+    for i in range(len(order)):
+        for j in range(10):
+            trend_map[0, j+i*10, :, :] = trends[order[i]].val[0, 0, :, :]
+    trend_map[grid3D.val[1:, :125, :, :] != 1] = np.nan
+    return trend_map
+
+failures = []
+with tempfile.TemporaryDirectory() as pathTmp:
+    with contextlib.redirect_stdout(io.StringIO()):
+        data    = create_synthetic_dataset(os.path.join(pathTmp, 'data'), scale=scale, seed=args.seed)
+        context = prepare_benchmark(data, pathJupyter)
+        trend   = context['trend']
+        grid3D  = synthetic_grid3D(context)
+        grid3D.val = np.array(grid3D.val)
+        sims    = synthetic_trend_simulations(context)
+
+    #Head file with 3 times of 2 layers
+    ncpl  = len(context['mesh'].iverts)
+    rng   = np.random.default_rng(args.seed)
+    parts = []
+    for t in range(3):
+        pathPart = os.path.join(pathTmp, 'part{}.hds'.format(t))
+        write_head_file(pathPart, rng.normal(size=(2, ncpl)), kstp=t+1, kper=1, totim=float(t+1))
+        with open(pathPart, 'rb') as file:
+            parts.append(file.read())
+    pathHDS = os.path.join(pathTmp, 'multi.hds')
+    with open(pathHDS, 'wb') as file:
+        file.write(b''.join(parts))
+    reference = flopy.utils.HeadFile(pathHDS, precision='double').get_data()
+    head      = trend['read_head_file'](pathHDS)
+    if head.shape != reference.shape or not np.array_equal(head, reference):
+        failures.append('read_head_file differs from HeadFile.get_data() on a file with 3 times and 2 layers')
+
+    #One mesh per simulation, then the mesh of the first simulation shared by all the simulations
+    geometry = context['geometry']
+    lx       = geometry['nx']*geometry['sx']
+    xcyc     = sims['meshes'][0].get_xcyc()
+    shared   = []
+    for i in range(len(sims['layers'])):
+        pathSim = os.path.join(pathTmp, 'shared{}'.format(i))
+        os.makedirs(pathSim)
+        write_head_file(os.path.join(pathSim, 'mf.hds'), (xcyc[:, 0]-geometry['ox'])/lx+np.sin(i*xcyc[:, 1]))
+        shared.append(pathSim)
+
+    for name, meshes, paths in [('one mesh per simulation', sims['meshes'], sims['paths']),
+                                ('shared mesh', [sims['meshes'][0]]*len(shared), shared)]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            loop           = trend_loop(trend, grid3D, meshes, paths, sims['layers'])
+            heads, offsets = trend['read_heads'](paths)
+            batch          = trend['heads_to_trend'](meshes, heads, offsets, sims['layers'], grid3D, nz=125).val
+        if batch.shape != loop.shape or not np.array_equal(batch, loop, equal_nan=True):
+            failures.append('heads_to_trend differs from the notebook loop ({}), max difference {}'.format(
+                            name, np.nanmax(np.abs(batch-loop))))
+
+print('*** Trend check : {} mismatches on 3 comparisons ***'.format(len(failures)))
+for failure in failures:
+    print('    {}'.format(failure))
+
+if len(failures) > 0:
+    sys.exit(1)
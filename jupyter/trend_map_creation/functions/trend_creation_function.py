@@ -15,8 +15,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import os
 import geopandas as gp
+import shapely
 import shutil
-from scipy.interpolate import griddata
+from scipy.interpolate import griddata, CloughTocher2DInterpolator
 from geone import img
 import geone.imgplot as imgplt
 import geone.customcolors as ccol
@@ -283,7 +284,7 @@ def run_simulation(mesh, chdlist):
 ########
 #5
 ########
-def get_head(path='./simulation_mf6/',plotFig =False, saveFig=False):
+def get_head(path='./simulation_mf6/',plotFig =False, saveFig=False, mesh=None):
     '''
     Get the head output of the simulation.
     The head output can be plot or save as pdf.
@@ -293,6 +294,7 @@ def get_head(path='./simulation_mf6/',plotFig =False, saveFig=False):
     path : path ot the simulation folder.
     plotFig : (boolean) 
     saveFig : (boolean)
+    mesh : triangular mesh, created with the create_mesh function (required to plot).
     
     Outputs:
     ---------
@@ -304,10 +306,12 @@ def get_head(path='./simulation_mf6/',plotFig =False, saveFig=False):
     head  = hdobj.get_data()                                 #Extract an array of the head outputs
     
     if plotFig == True:
+        if mesh is None:
+            raise ValueError('a mesh is required to plot the head (mesh parameter)')
         #Plot the head
         fig = plt.figure(figsize=(5,5))
         ax  = plt.subplot(1, 1, 1, aspect='equal')
-        h   = grid.plot(ax=ax, a=head[0, 0, :], cmap='winter', alpha=.9)
+        h   = mesh.plot(ax=ax, a=head[0, 0, :], cmap='winter', alpha=.9)
         
     if saveFig ==True:
         fig.savefig('head_output.pdf')
@@ -341,7 +345,8 @@ def mf_to_geone(mesh, head, mask=False, xMin=664328.1865, xMax=664737.1865,
         xMax, yMax = xMin+(sx*nx), yMin+(sy*ny)
         
     #Get the coordinate of the grid
-    x, y = mesh.get_xcyc()[:,0],mesh.get_xcyc()[:,1]
+    xcyc = mesh.get_xcyc()
+    x, y = xcyc[:,0], xcyc[:,1]
     head_val = head[0,0,:]
     
     #Create the new grid 
@@ -363,4 +368,177 @@ def mf_to_geone(mesh, head, mask=False, xMin=664328.1865, xMax=664737.1865,
                 ox=xMin,oy=yMin,oz=0,
                 nv=1,val=trend)
     
-    return trend
\ No newline at end of file
+    return trend
+
+
+########
+#7
+########
+def read_head_file(pathHDS, precision='double'):
+    '''
+    Read a MODFLOW 6 binary head file without flopy.
+    The file is memory-mapped as a sequence of records (header + values of one layer),
+    the records of the last time step are returned.
+    
+    Inputs:
+    ---------
+    pathHDS : path to the .hds file.
+    precision : 'double' (MODFLOW 6 default) or 'single'.
+    
+    Outputs:
+    ---------
+    head : array (nlay, nrow, ncol) of the head values, like flopy HeadFile.get_data()
+           (nrow=1 and ncol=ncpl for a DISV grid).
+    '''
+    
+    real = '<f8' if precision=='double' else '<f4'
+    dtype_header = np.dtype([('kstp', '<i4'), ('kper', '<i4'), ('pertim', real), ('totim', real),
+                             ('text', 'S16'), ('ncol', '<i4'), ('nrow', '<i4'), ('ilay', '<i4')])
+    
+    #The first header gives the size of the records
+    header = np.fromfile(pathHDS, dtype=dtype_header, count=1)[0]
+    ncol, nrow = int(header['ncol']), int(header['nrow'])
+    
+    dtype_record = np.dtype(dtype_header.descr+[('data', real, (nrow, ncol))])
+    records = np.memmap(pathHDS, dtype=dtype_record, mode='r')
+    
+    #Layers of the last time
+    last = records['totim'] == records['totim'][-1]
+    ilay = records['ilay'][last]
+    head = np.asarray(records['data'][last])[np.argsort(ilay, kind='stable')]
+    del records
+    
+    return head
+
+
+########
+#8
+########
+def read_heads(paths, name='mf', precision='double'):
+    '''
+    Read the head outputs of several simulation folders with the read_head_file function.
+    The heads of the first layer are stacked in one array, the simulations can have different numbers of cells.
+    
+    Inputs:
+    ---------
+    paths : list of the paths to the simulation folders.
+    name : name of the simulation (the head file is name.hds).
+    precision : 'double' or 'single'.
+    
+    Outputs:
+    ---------
+    heads : array of the head values of all the simulations, one after the other.
+    offsets : array (len(paths)+1), the heads of the simulation i are heads[offsets[i]:offsets[i+1]].
+    '''
+    
+    values  = [read_head_file(os.path.join(path, name+'.hds'), precision=precision)[0].ravel() for path in paths]
+    offsets = np.concatenate(([0], np.cumsum([v.size for v in values])))
+    heads   = np.concatenate(values)
+    
+    return heads, offsets
+
+
+########
+#9
+########
+def mesh_centres(mesh):
+    '''
+    Cell centres of a triangular mesh, vectorized version of mesh.get_xcyc().
+    The centroids are computed by shapely for all the cells at once, with the same
+    algorithm as flopy, so the values are identical to mesh.get_xcyc().
+    
+    Inputs:
+    ---------
+    mesh : triangular mesh, created with the create_mesh function.
+    
+    Outputs:
+    ---------
+    xcyc : array (ncpl, 2) of the x and y coordinates of the cell centres.
+    '''
+    
+    iverts = np.asarray(mesh.iverts)
+    if iverts.ndim != 2 or iverts.shape[1] != 3:
+        return mesh.get_xcyc()
+    
+    return shapely.get_coordinates(shapely.centroid(shapely.polygons(mesh.verts[iverts])))
+
+
+########
+#10
+########
+def heads_to_trend(meshes, heads, offsets, layers, mask3D, nz=125, layers_per_map=10,
+                   xMin=664328.1865, yMin=6153000.2413, nx=409, ny=512, sx=100, sy=100):
+    '''
+    Create the 3D trend map from the head outputs of several simulations, in one pass.
+    It replaces the notebook loop (mf_to_geone for each simulation, masked by its layer of mask3D,
+    then each 2D trend copied to layers_per_map layers and masked by mask3D) and gives the same values :
+    the cell centres of each mesh are computed once (mesh_centres), the meshes shared by several
+    simulations are triangulated once, the heads are only interpolated inside the mask, and the
+    interpolated values are written directly in the layers of the 3D trend map under the mask.
+    
+    Inputs:
+    ---------
+    meshes : list of the triangular meshes of the simulations, created with the create_mesh function.
+    heads, offsets : head values, created with the read_heads function.
+    layers : list of the layer of mask3D corresponding to each simulation (e.g. [0,10,100,110,20,...]),
+             the simulation covers the layers layers[i] to layers[i]+layers_per_map-1.
+    mask3D : 3D grid Img, the variable 1 (transformed grid) is used as mask.
+             If mask3D is False, the geometry parameters are used and no mask is applied.
+    nz : number of layers of the trend map.
+    layers_per_map : number of layers receiving the same 2D trend.
+    
+    Outputs:
+    ---------
+    trendMap : Geone Img of the 3D trend map.
+    '''
+    
+    if mask3D is not False:
+        nx, ny     = mask3D.nx, mask3D.ny
+        sx, sy     = mask3D.sx, mask3D.sy
+        xMin, yMin = mask3D.ox, mask3D.oy
+        sz, oz     = mask3D.sz, mask3D.oz
+        mask       = mask3D.val[1, :nz] == 1
+    else:
+        sz, oz     = 1, 0
+        mask       = np.ones((nz, ny, nx), dtype=bool)
+    xMax, yMax = xMin+(sx*nx), yMin+(sy*ny)
+    
+    #Grid of mf_to_geone
+    xG = np.linspace(xMin, xMax, nx)
+    yG = np.linspace(yMin, yMax, ny)
+    
+    #Interpolation of the heads, one triangulation for the simulations sharing a mesh
+    layers    = np.asarray(layers)
+    trend_map = np.full((1, nz, ny, nx), np.nan)
+    groups    = {}
+    for i, mesh in enumerate(meshes):
+        groups.setdefault(id(mesh), []).append(i)
+    
+    for group in groups.values():
+        xcyc   = mesh_centres(meshes[group[0]])
+        values = np.column_stack([heads[offsets[i]:offsets[i+1]] for i in group])
+        
+        #Only the cells inside the mask of the simulations are interpolated
+        used = np.zeros((ny, nx), dtype=bool)
+        for i in group:
+            if layers[i] < nz:
+                used |= mask[layers[i]]
+        iy, ix = np.nonzero(used)
+        
+        interpo = CloughTocher2DInterpolator(xcyc, values)(xG[ix], yG[iy])
+        
+        #Each map is written in its layers, where both its own layer and the receiving layer are in the mask
+        for k, i in enumerate(group):
+            if layers[i] >= nz:
+                continue
+            inside = mask[layers[i], iy, ix]
+            for z in range(layers[i], min(layers[i]+layers_per_map, nz)):
+                sel = inside & mask[z, iy, ix]
+                trend_map[0, z, iy[sel], ix[sel]] = interpo[sel, k]
+    
+    trendMap = img.Img(nx=nx, ny=ny, nz=nz,
+                       sx=sx, sy=sy, sz=sz,
+                       ox=xMin, oy=yMin, oz=oz,
+                       nv=1, val=trend_map)
+    
+    return trendMap